@@ -1,10 +1,23 @@
-from mistyPy.Robot import Robot
+import os
+import sys
+
+# Share the top-level modules (mistyTransport, ...) with the main scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mistyTransport import PooledRobot
+from robotState import ShadowRobot
+from robotMetrics import instrument, print_summary_at_exit, serve_metrics
+from speechPacing import SpeechPacer
+from fanOut import fan_out
 import time
 
 # --------------------------------------
 # CONFIG
 # --------------------------------------
-ROBOT_IP = "192.168.1.237"
+# MISTY_IP=127.0.0.1:8080 points the intro at mistySim.py instead
+ROBOT_IP = os.environ.get("MISTY_IP", "192.168.1.237")
+
+LINE_GAP = 0.4  # s of silence between two lines
 
 
 # --------------------------------------
@@ -21,9 +34,9 @@ def set_neutral_eyes(misty):
 
 def reset_posture_authoritative(misty):
     """Neutral, straight posture before starting."""
-    misty.move_head(0, 0, 0, 50)
-    misty.move_arm("left", 10, 60)
-    misty.move_arm("right", 10, 60)
+    fan_out(lambda: misty.move_head(0, 0, 0, 50),
+            lambda: misty.move_arm("left", 10, 60),
+            lambda: misty.move_arm("right", 10, 60))
 
 
 def head_pan_left_right_authoritative(misty, duration=2.0):
@@ -47,12 +60,12 @@ def little_arm_demo_neutral(misty):
     Still large enough to be clearly visible.
     """
     # Raise both arms
-    misty.move_arm("left", 70, 70)
-    misty.move_arm("right", 70, 70)
+    fan_out(lambda: misty.move_arm("left", 70, 70),
+            lambda: misty.move_arm("right", 70, 70))
     time.sleep(0.8)
     # Lower to a mid position
-    misty.move_arm("left", 25, 70)
-    misty.move_arm("right", 25, 70)
+    fan_out(lambda: misty.move_arm("left", 25, 70),
+            lambda: misty.move_arm("right", 25, 70))
     time.sleep(0.8)
 
 
@@ -60,16 +73,23 @@ def little_arm_demo_neutral(misty):
 # LOWER-PITCH SPEAKER WRAPPER
 # --------------------------------------
 
-def speak_authoritative(misty, text):
+def speak_authoritative(speech, text):
     """
     Speak with a lower pitch for the authoritative style.
+    Returns the utterance id, pass it to speech.wait().
 
     pitch:
       0 = deep
       1 = default
       2 = high
     """
-    misty.speak(text, 0)  # lower pitch
+    return speech.speak(text, 0)  # lower pitch
+
+
+def finish_line(speech, utterance):
+    """Wait until Misty is done with the line, then a short natural gap."""
+    speech.wait(utterance)
+    time.sleep(LINE_GAP)
 
 
 # --------------------------------------
@@ -84,54 +104,53 @@ def play_authoritative_intro(misty):
     - Lower voice pitch
     """
 
+    speech = SpeechPacer(misty)
+
     reset_posture_authoritative(misty)
     set_neutral_eyes(misty)
     time.sleep(0.5)
 
     # Line 1
     set_neutral_eyes(misty)
-    speak_authoritative(misty, "Hello. My name is Misty")
-    time.sleep(3)
+    finish_line(speech, speak_authoritative(speech, "Hello. My name is Misty"))
 
     # Line 2
-    speak_authoritative(misty, "I am a robot developed by Misty Robotics")
-    time.sleep(3)
+    finish_line(speech, speak_authoritative(speech, "I am a robot developed by Misty Robotics"))
 
-    # Line 3 – arms, controlled
+    # Line 3 – arms, controlled (gesture runs while Misty talks)
     set_neutral_eyes(misty)
-    speak_authoritative(
-        misty,
+    utterance = speak_authoritative(
+        speech,
         "I am capable of performing a variety of actions. I can move my arms"
     )
     little_arm_demo_neutral(misty)
-    time.sleep(2)
+    finish_line(speech, utterance)
 
     # Line 4 – head movement, only left and right
     set_neutral_eyes(misty)
-    speak_authoritative(misty, "I can also rotate my head")
+    utterance = speak_authoritative(speech, "I can also rotate my head")
     head_pan_left_right_authoritative(misty, duration=3.0)
-    time.sleep(1.5)
+    finish_line(speech, utterance)
 
     # Line 5 – supervision / task focus
     set_neutral_eyes(misty)
-    speak_authoritative(
-        misty,
+    finish_line(speech, speak_authoritative(
+        speech,
         "When I interact with humans, I provide clear guidance and ensure tasks are performed correctly"
-    )
-    time.sleep(5)
+    ))
 
     # Line 6 – competence / decision framing
     set_neutral_eyes(misty)
-    speak_authoritative(
-        misty,
+    finish_line(speech, speak_authoritative(
+        speech,
         "These abilities make me reliable when important decisions or supervision are required"
-    )
-    time.sleep(4)
+    ))
 
     # End pose: neutral, facing forward
     set_neutral_eyes(misty)
     misty.move_head(0, 0, 0, 40)
     time.sleep(1)
+    speech.close()
 
 
 # --------------------------------------
@@ -139,5 +158,8 @@ def play_authoritative_intro(misty):
 # --------------------------------------
 
 if __name__ == "__main__":
-    misty = Robot(ROBOT_IP)
+    serve_metrics()
+    print_summary_at_exit()
+    misty = ShadowRobot(instrument(PooledRobot(ROBOT_IP)))
     play_authoritative_intro(misty)
+    print(misty.report())
@@ -1,10 +1,23 @@
-from mistyPy.Robot import Robot
+import os
+import sys
+
+# Share the top-level modules (mistyTransport, ...) with the main scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mistyTransport import PooledRobot
+from robotState import ShadowRobot
+from robotMetrics import instrument, print_summary_at_exit, serve_metrics
+from speechPacing import SpeechPacer
+from fanOut import fan_out
 import time
 
 # --------------------------------------
 # CONFIG
 # --------------------------------------
-ROBOT_IP = "192.168.1.237"
+# MISTY_IP=127.0.0.1:8080 points the intro at mistySim.py instead
+ROBOT_IP = os.environ.get("MISTY_IP", "192.168.1.237")
+
+LINE_GAP = 0.4  # s of silence between two lines
 
 
 # --------------------------------------
@@ -35,9 +48,9 @@ def set_heart_eyes(misty):
 
 def reset_posture_supportive(misty):
     """Neutral-ish posture before starting."""
-    misty.move_head(0, 0, 0, 50)          # pitch, roll, yaw, velocity
-    misty.move_arm("left", 10, 60)
-    misty.move_arm("right", 10, 60)
+    fan_out(lambda: misty.move_head(0, 0, 0, 50),  # pitch, roll, yaw, velocity
+            lambda: misty.move_arm("left", 10, 60),
+            lambda: misty.move_arm("right", 10, 60))
 
 
 def head_pan_left_right_supportive(misty, duration=2.0):
@@ -62,15 +75,21 @@ def little_arm_demo_supportive(misty):
     Larger positions so it's easy to see.
     """
     # Raise both arms quite a bit
-    misty.move_arm("left", 80, 80)
-    misty.move_arm("right", 80, 80)
+    fan_out(lambda: misty.move_arm("left", 80, 80),
+            lambda: misty.move_arm("right", 80, 80))
     time.sleep(0.8)
     # Lower them again, but not all the way down
-    misty.move_arm("left", 30, 80)
-    misty.move_arm("right", 30, 80)
+    fan_out(lambda: misty.move_arm("left", 30, 80),
+            lambda: misty.move_arm("right", 30, 80))
     time.sleep(0.8)
 
 
+def finish_line(speech, utterance):
+    """Wait until Misty is done with the line, then a short natural gap."""
+    speech.wait(utterance)
+    time.sleep(LINE_GAP)
+
+
 # --------------------------------------
 # SUPPORTIVE INTRO BEHAVIOUR
 # --------------------------------------
@@ -84,50 +103,50 @@ def play_supportive_intro(misty):
       - speak
     """
 
+    speech = SpeechPacer(misty)
+
     reset_posture_supportive(misty)
     set_supportive_eyes(misty)
     time.sleep(0.5)
 
     # Line 1
     set_supportive_eyes(misty)
-    misty.speak("Hi! My name is Misty")
-    time.sleep(3)
+    finish_line(speech, speech.speak("Hi! My name is Misty"))
 
     # Line 2
-    misty.speak("I'm a robot developed by Misty Robotics")
-    time.sleep(3)
+    finish_line(speech, speech.speak("I'm a robot developed by Misty Robotics"))
 
-    # Line 3 – arms + happy eyes
+    # Line 3 – arms + happy eyes (gesture runs while Misty talks)
     set_supportive_eyes(misty)
-    misty.speak("I can do many things. Look, I can move my arms")
+    utterance = speech.speak("I can do many things. Look, I can move my arms")
     little_arm_demo_supportive(misty)
-    time.sleep(2)
+    finish_line(speech, utterance)
 
     # Line 4 – head moves, playful but only left/right
     set_admiration_eyes(misty)
-    misty.speak("And I can move my head too")
+    utterance = speech.speak("And I can move my head too")
     head_pan_left_right_supportive(misty, duration=2.0)
-    time.sleep(1.5)
+    finish_line(speech, utterance)
 
     # Line 5 – supportive / guidance framing
 
-    misty.speak(
+    finish_line(speech, speech.speak(
         "When I interact with people, I try to be supportive "
         "and make tasks feel comfortable for you"
-    )
-    time.sleep(5)
+    ))
     set_heart_eyes(misty)
     # Line 6 – warm goal
-    misty.speak(
+    utterance = speech.speak(
         "My goal is to help you and make our interaction enjoyable"
     )
     head_pan_left_right_supportive(misty, duration=2.0)
-    time.sleep(3)
+    finish_line(speech, utterance)
 
     # End pose: centered, warm eyes
     set_supportive_eyes(misty)
     misty.move_head(0, 0, 0, 40)
     time.sleep(1)
+    speech.close()
 
 
 # --------------------------------------
@@ -135,5 +154,8 @@ def play_supportive_intro(misty):
 # --------------------------------------
 
 if __name__ == "__main__":
-    misty = Robot(ROBOT_IP)
+    serve_metrics()
+    print_summary_at_exit()
+    misty = ShadowRobot(instrument(PooledRobot(ROBOT_IP)))
     play_supportive_intro(misty)
+    print(misty.report())
@@ -1,11 +1,16 @@
+import os
+import sys
+
 import requests
 
+# Share the top-level modules (mistyTransport, ...) with the main scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mistyTransport import get_transport
+
 def set_image_display_settings(robot_ip, layer=None, revert_to_default=False, deleted=False, visible=True, opacity=1.0,
                                width=480, height=272, stretch="UniformToFill", place_on_top=True, rotation=0,
                                horizontal_alignment="Center", vertical_alignment="Center"):
-    # Define the endpoint URL
-    url = f"http://{robot_ip}/api/images/settings"
-    
     # Prepare the payload with required and optional fields
     payload = {
         "RevertToDefault": revert_to_default,
@@ -26,9 +31,9 @@ def set_image_display_settings(robot_ip, layer=None, revert_to_default=False, de
         payload["Layer"] = layer
 
     try:
-        # Send the POST request
-        response = requests.post(url, json=payload)
-        response.raise_for_status()  # Raise an exception for HTTP errors
+        # Send the POST request over the shared keep-alive connection
+        # (raises for HTTP errors and times out instead of hanging)
+        response = get_transport(robot_ip).post("images/settings", json=payload)
         
         # Output the JSON response for success confirmation
         result = response.json()
@@ -36,7 +41,8 @@ def set_image_display_settings(robot_ip, layer=None, revert_to_default=False, de
             print("Image display settings updated successfully:", result)
         else:
             print("Settings update encountered issues:", result)
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, ConnectionError) as e:
+        # ConnectionError: RobotOffline, the robot was marked offline and nothing was sent
         print(f"Request failed: {e}")
 
 
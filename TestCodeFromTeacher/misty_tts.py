@@ -1,9 +1,14 @@
+import os
+import sys
+
 import requests
 
+# Share the top-level modules (mistyTransport, ...) with the main scripts
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mistyTransport import get_transport
+
 def send_tts_command(robot_ip, text, flush=False, utterance_id=None):
-    # Define the endpoint URL
-    url = f"http://{robot_ip}/api/tts/speak"
-    
     # Prepare the payload with required and optional fields
     payload = {
         "Text": text,
@@ -15,9 +20,9 @@ def send_tts_command(robot_ip, text, flush=False, utterance_id=None):
         payload["UtteranceId"] = utterance_id
 
     try:
-        # Send the POST request
-        response = requests.post(url, json=payload)
-        response.raise_for_status()  # Raise an exception for HTTP errors
+        # Send the POST request over the shared keep-alive connection
+        # (raises for HTTP errors and times out instead of hanging)
+        response = get_transport(robot_ip).post("tts/speak", json=payload)
         
         # Output the JSON response for success confirmation
         result = response.json()
@@ -25,8 +30,8 @@ def send_tts_command(robot_ip, text, flush=False, utterance_id=None):
             print("Command executed successfully:", result)
         else:
             print("Command execution encountered issues:", result)
-    except requests.exceptions.RequestException as e:
-        # Handle any errors (network issues, timeout, etc.)
+    except (requests.exceptions.RequestException, ConnectionError) as e:
+        # Handle any errors (network issues, timeout, the robot marked offline, etc.)
         print(f"Request failed: {e}")
 
 # Example usage
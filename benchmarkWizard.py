@@ -0,0 +1,274 @@
+"""
+End-to-end latency benchmark for the wizard commands and the intros.
+
+    python benchmarkWizard.py --iterations 10 --latency normal:0.04,0.015
+    python benchmarkWizard.py --robot 192.168.1.237   # against a real robot
+
+Every wizard command (1-12, 99) of both wizards and both PilotCode intros
+is driven against mistySim (or a real robot). Commands are submitted to
+the wizard's CommandQueue exactly as a keypress is, so queueing and
+preemption are part of the measurement. For each command it reports
+p50/p95/p99 of keypress -> first robot output and keypress -> command
+done (the queue's on_done), plus HTTP requests sent per command (every
+attempt, retries included), and saves everything as JSON so results can
+be compared between releases.
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+
+import memoryAuthoritative
+import memorySupportive
+from mistySim import MistySim
+from mistyTransport import PooledRobot
+from personas import PERSONAS
+from robotState import ShadowRobot
+from wizardQueue import CommandQueue
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+HERE = os.path.dirname(os.path.abspath(__file__))
+WIZARD_COMMANDS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 99]
+INTROS = [
+    ("authoritative_intro", "PilotCode/Authorative.py", "play_authoritative_intro"),
+    ("supportive_intro", "PilotCode/Supportive.py", "play_supportive_intro"),
+]
+
+
+def percentile(values, p):
+    """Nearest-rank percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(p / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples):
+    """samples: list of (first output s or None, done s, HTTP calls)."""
+    first = [s[0] for s in samples if s[0] is not None]
+    done = [s[1] for s in samples]
+    calls = [s[2] for s in samples]
+    return {
+        "iterations": len(samples),
+        "first_output_s": {f"p{p}": percentile(first, p) for p in (50, 95, 99)},
+        "done_s": {f"p{p}": percentile(done, p) for p in (50, 95, 99)},
+        "http_calls": {"mean": sum(calls) / len(calls) if calls else 0, "max": max(calls, default=0)},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --------------------------------------
+# MEASUREMENT
+# --------------------------------------
+
+class Probe:
+    """
+    Counts the HTTP requests the transport's session sends (every attempt,
+    so retries count) and finds the first output of one command, from the
+    simulator's log when we have one. Hooks the session while in a with
+    block:
+
+        with Probe(sim, game.misty.transport) as probe:
+            probe.measure(action)
+    """
+
+    def __init__(self, sim, transport):
+        self.sim = sim
+        self.session = transport.session
+        self.calls = []  # (monotonic time, method, url) of every request sent
+        self._send = None
+
+    def __enter__(self):
+        self._send = send = self.session.send
+
+        def recording_send(request, **kwargs):
+            self.calls.append((time.monotonic(), request.method, request.url))
+            return send(request, **kwargs)
+        self.session.send = recording_send
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.session.send = self._send
+        return False
+
+    def measure(self, action):
+        start = len(self.calls)
+        t0 = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            action()
+        done = time.monotonic() - t0
+        calls = self.calls[start:]
+
+        if self.sim is not None:
+            first = self.sim.first_output_since(t0)
+        else:
+            # A real robot acts about when our request leaves
+            first = next((t for t, method, _ in calls if method != "GET"), None)
+        return (None if first is None else first - t0), done, len(calls)
+
+
+class QueuedCommands:
+    """Submits commands the way the wizard prompt does and waits for on_done."""
+
+    def __init__(self, game, dispatch):
+        self.finished = threading.Event()
+        self.outcome = None
+        self.queue = CommandQueue(game, dispatch, on_done=self._done)
+
+    def _done(self, cmd, args, outcome, seconds):
+        self.outcome = outcome
+        self.finished.set()
+
+    def run(self, cmd, args):
+        self.finished.clear()
+        self.queue.submit(cmd, args)
+        self.finished.wait()
+        return self.outcome
+
+
+def round_arguments():
+    """Every (difficulty, round) pair, cycled through by command 2."""
+    return [
+        [difficulty, round_number]
+        for difficulty, rounds in sorted(memoryAuthoritative.DIFFICULTY_SEQUENCES.items())
+        for round_number in range(1, len(rounds) + 1)
+    ]
+
+
+def setup_command(cmd, i, rounds):
+    """
+    (cmd, args) to run, unmeasured, before the i-th run of a command, or
+    None: command 12 needs command 2 to have played the round it scores.
+    """
+    if cmd == 12:
+        return 2, rounds[i % len(rounds)]
+    return None
+
+
+def command_arguments(game, cmd, i, rounds):
+    """
+    Arguments for the i-th run of a command, as typed at the prompt.
+    Command 12 gets the right answer to the round its setup played.
+    """
+    if cmd == 2:
+        return rounds[i % len(rounds)]
+    if cmd == 10:
+        # Alternate between the other persona and our own
+        numbers = sorted(PERSONAS)
+        own = next(n for n in numbers if PERSONAS[n] is game.persona)
+        return [numbers[(numbers.index(own) + 1) % len(numbers)]]
+    if cmd == 12:
+        sequence = game.sequences.sequence(*rounds[i % len(rounds)])
+        return ["".join(color[0] for color in sequence)]
+    return []
+
+
+def bench_wizard(module, game, probe, iterations):
+    results = {}
+    rounds = round_arguments()
+    commands = QueuedCommands(game, module.run_command)
+    persona = game.persona
+    for cmd in WIZARD_COMMANDS:
+        samples = []
+        for i in range(iterations):
+            setup = setup_command(cmd, i, rounds)
+            if setup is not None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    commands.run(*setup)
+            args = command_arguments(game, cmd, i, rounds)
+            samples.append(probe.measure(lambda: commands.run(cmd, args)))
+        if game.persona is not persona:
+            game.set_persona(persona)
+        results[str(cmd)] = summarize(samples)
+        print(f"  command {cmd:>2}: p50 first output "
+              f"{_ms(results[str(cmd)]['first_output_s']['p50'])}, "
+              f"p50 done {_ms(results[str(cmd)]['done_s']['p50'])}")
+    commands.queue.close()
+    return results
+
+
+def bench_intro(path, function, misty, probe, iterations):
+    spec = importlib.util.spec_from_file_location(
+        "intro_" + os.path.splitext(os.path.basename(path))[0], os.path.join(HERE, path)
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    play = getattr(module, function)
+    return summarize([probe.measure(lambda: play(misty)) for _ in range(iterations)])
+
+
+def _ms(value):
+    return "-" if value is None else f"{value * 1000:.0f} ms"
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wizard latency benchmark")
+    parser.add_argument("--iterations", type=int, default=5, help="runs per wizard command")
+    parser.add_argument("--intro-iterations", type=int, default=1, help="runs per intro")
+    parser.add_argument("--robot", default=None, help="benchmark a real robot instead of mistySim")
+    parser.add_argument("--latency", default="normal:0.04,0.015", help="mistySim latency spec")
+    parser.add_argument("--loss", type=float, default=0.0, help="mistySim packet loss")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    sim = None
+    address = args.robot
+    if address is None:
+        sim = MistySim(port=0, latency=args.latency, loss=args.loss,
+                       scenario="none", seed=args.seed).start()
+        address = sim.address
+
+    results = {}
+    for name, module, game_class in [
+        ("authoritative", memoryAuthoritative, memoryAuthoritative.AuthoritativeMemoryGame),
+        ("supportive", memorySupportive, memorySupportive.SupportiveMemoryGame),
+    ]:
+        print(f"{name} wizard:")
+        game = game_class(address)
+        with Probe(sim, game.misty.transport) as probe:
+            results[name] = bench_wizard(module, game, probe, args.iterations)
+
+    for name, path, function in INTROS:
+        print(f"{name}:")
+        misty = ShadowRobot(PooledRobot(address))
+        with Probe(sim, misty.transport) as probe:
+            results[name] = bench_intro(path, function, misty, probe, args.intro_iterations)
+        print(f"  p50 done {_ms(results[name]['done_s']['p50'])}")
+
+    if sim is not None:
+        sim.stop()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "robot": args.robot or "mistySim",
+        "latency": None if args.robot else args.latency,
+        "loss": None if args.robot else args.loss,
+        "iterations": args.iterations,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.output}")
@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from mistyTransport import POOL_SIZE
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+# At most this many commands in flight at once; matches the keep-alive
+# connections per robot so no call has to open a new one.
+FAN_OUT_WORKERS = POOL_SIZE
+
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()  # .executor: the pool whose group command runs on this thread
+
+
+def _shared_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS,
+                                           thread_name_prefix="fan-out")
+        return _executor
+
+
+def _run_on(executor, function, args, kwargs):
+    """A group command, marked as running on `executor`'s thread."""
+    outer = getattr(_worker, "executor", None)
+    _worker.executor = executor
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _worker.executor = outer
+
+
+# --------------------------------------
+# GROUPS OF INDEPENDENT COMMANDS
+# --------------------------------------
+
+class FanOut:
+    """
+    Sends a group of independent robot commands at the same time and
+    waits for all of them at the end of the block:
+
+        with FanOut() as group:
+            group.add(misty.display_image, "e_Joy.jpg")
+            group.add(misty.change_led, 0, 255, 0)
+            utterance = group.add(speech.speak, "Hello!")
+        utterance.result()
+
+    The group takes about one round trip instead of one per command.
+    Only put commands in a group if their order doesn't matter.
+
+    A group opened inside a command of another group on the same pool
+    (the shared one or an executor passed in) runs its commands one by one
+    on the calling thread: queueing them behind the very workers that wait
+    for them could deadlock the pool.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor or _shared_executor()
+        self.inline = getattr(_worker, "executor", None) is self.executor
+        self.futures = []
+
+    def add(self, function, *args, **kwargs):
+        """Start one command; returns its Future."""
+        if self.inline:
+            future = Future()
+            try:
+                future.set_result(function(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self.executor.submit(_run_on, self.executor, function, args, kwargs)
+        self.futures.append(future)
+        return future
+
+    def join(self):
+        """Wait for every command; re-raise the first one that failed."""
+        wait(self.futures)
+        for future in self.futures:
+            error = future.exception()
+            if error is not None:
+                raise error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.join()
+        else:
+            wait(self.futures)
+        return False
+
+
+def fan_out(*calls):
+    """Run zero-argument callables concurrently; returns their results in order."""
+    with FanOut() as group:
+        futures = [group.add(call) for call in calls]
+    return [future.result() for future in futures]
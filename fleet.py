@@ -0,0 +1,274 @@
+"""
+Fleet mode: run the memory game or the greeting skill on many robots at once.
+
+    python fleet.py memory 192.168.1.237 192.168.1.238 --persona 1,2
+    python fleet.py memory --sim 24 --script "1; 2 1 1; 12 g; 2 1 2; 12 gb; 99"
+    python fleet.py greeting --sim 12
+    MISTY_FLEET=192.168.1.237,192.168.1.238 python fleet.py greeting
+
+One asyncio event loop drives every robot with the same code the wizard
+and test.py use: a MemoryGame per robot, fed the scripted wizard commands
+through run_command, or a GreetingSkill with its SensorActor. Each robot
+gets its own game thread (run_in_executor), so a robot that is
+mid-sentence doesn't hold up the others. The game code waits in
+time.sleep and Event.wait, so that is still one mostly idle OS thread per
+robot: fine for a lab's tens of robots, not for thousands. The robots
+share one HTTP session (a keep-alive pool per robot) and one bounded set
+of worker threads for their FanOut groups. REST metrics are labelled with
+each robot's address (robotMetrics); the fleet adds a per-robot summary
+at the end.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from greetingSkill import GreetingSkill
+from memoryGame import MemoryGame, default_sequences, run_command
+from mistyTransport import MistyTransport, PooledRobot, shared_pool
+from personas import PERSONAS
+from robotMetrics import METRICS, instrument, print_summary_at_exit, serve_metrics
+from robotState import ShadowRobot
+from sensorActor import SensorActor
+from sessionLog import open_session_log
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+FLEET_ENV = "MISTY_FLEET"   # comma-separated robot addresses
+# Wizard commands played on every robot, as typed at the wizard prompt
+DEFAULT_SCRIPT = "1; 7; 2 1 1; 12 g; 2 1 2; 12 gb; 2 1 3; 12 gbb; 6; 99"
+WIZARD_GAP = 0.5            # s between commands, the wizard's reaction time
+GREETING_TIMEOUT = 120      # s before a greeting without a head pat is given up
+
+
+def fleet_addresses(addresses):
+    """Addresses from the command line, else from MISTY_FLEET."""
+    if addresses:
+        return list(addresses)
+    return [a.strip() for a in os.environ.get(FLEET_ENV, "").split(",") if a.strip()]
+
+
+def parse_script(script):
+    """
+    "1; 2 1 1; 12 g; 99" -> [(1, []), (2, [1, 1]), (12, ["g"]), (99, [])],
+    the arguments parsed as the wizard prompt does.
+    """
+    commands = []
+    for part in script.split(";"):
+        fields = part.split()
+        if not fields:
+            continue
+        cmd = int(fields[0])
+        if cmd == 12:
+            commands.append((cmd, fields[1:]))  # the answer, as typed
+        else:
+            commands.append((cmd, [int(x) for x in fields[1:] if x.isdigit()]))
+    return commands
+
+
+# --------------------------------------
+# ONE THREAD PER ROBOT
+# --------------------------------------
+
+class RobotThread:
+    """
+    Awaitable front end of one robot: blocking calls (a whole wizard
+    command, the greeting's setup) run in order on the robot's own thread,
+    e.g. `await robot.run(run_command, game, 2, [1, 1])`.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"robot-{address}")
+
+    def run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class RobotOutput:
+    """
+    sys.stdout for the fleet: what the robot threads print (the wizard's
+    "Correct sequence: ...") is prefixed with the robot, or dropped unless
+    verbose; everything else goes through unchanged.
+    """
+
+    def __init__(self, stream, verbose):
+        self.stream = stream
+        self.verbose = verbose
+        self._local = threading.local()
+
+    def write(self, text):
+        name = threading.current_thread().name
+        if not name.startswith("robot-"):
+            return self.stream.write(text)
+        if not self.verbose:
+            return len(text)
+        # Buffer per thread so a line is printed whole, with its robot
+        buffered = getattr(self._local, "text", "") + text
+        *lines, self._local.text = buffered.split("\n")
+        address = name[len("robot-"):].rsplit("_", 1)[0]
+        for line in lines:
+            self.stream.write(f"[{address}] {line}\n")
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+# --------------------------------------
+# MEMORY GAME SESSION
+# --------------------------------------
+
+async def run_memory(address, transport, executor, persona, script, seed=None,
+                     gap=WIZARD_GAP, participant=None, rounds=None):
+    """The wizard's MemoryGame on one robot, driven by a script instead of a prompt."""
+    robot = RobotThread(address)
+    commands = errors = 0
+    try:
+        game = await robot.run(MemoryGame, persona, address, default_sequences(seed, rounds),
+                               open_session_log(participant, address),
+                               transport=transport, executor=executor)
+        for cmd, args in script:
+            try:
+                await robot.run(run_command, game, cmd, args)
+            except Exception as e:
+                errors += 1
+                print(f"[{address}] Command {cmd} failed:", e)
+            commands += 1
+            METRICS.set_gauge("misty_fleet_commands_done", commands, address,
+                              "Scripted wizard commands finished on this robot.")
+            await asyncio.sleep(gap)
+        await robot.run(game.speech.close)
+        if game.session_log is not None:
+            await robot.run(game.session_log.close)
+        return commands, errors, f"{game.persona.name}: {game.misty.report()}"
+    finally:
+        robot.close()
+
+
+# --------------------------------------
+# GREETING SESSION
+# --------------------------------------
+
+async def run_greeting(address, transport, executor, verbose=False, timeout=GREETING_TIMEOUT):
+    """The test.py skill on one robot, until the head pat (or the timeout)."""
+    robot = RobotThread(address)
+    try:
+        misty = ShadowRobot(instrument(PooledRobot(address, transport)))
+        skill = GreetingSkill(misty, name=address, verbose=verbose, executor=executor)
+        # Every sensor callback of this robot runs on its actor thread
+        actor = SensorActor(address)
+        await robot.run(skill.go_neutral)
+        await robot.run(skill.register, actor)
+        if await robot.run(skill.done.wait, timeout):
+            outcome = "head pat"
+        else:
+            outcome = f"no head pat after {timeout} s"
+            await robot.run(skill.finish)
+        return 1, 0, f"{outcome}; {actor.report()}"
+    finally:
+        robot.close()
+
+
+# --------------------------------------
+# FLEET
+# --------------------------------------
+
+async def run_fleet(addresses, mode, personas, script, seed=None, gap=WIZARD_GAP,
+                    verbose=False, timeout=GREETING_TIMEOUT, participant=None, rounds=None):
+    """Run one session per robot at the same time; returns {address: (row)}."""
+    session, executor = shared_pool(len(addresses))
+
+    async def one(index, address):
+        started = time.monotonic()
+        transport = MistyTransport(address, session=session, executor=executor)
+        try:
+            if mode == "memory":
+                commands, errors, details = await run_memory(
+                    address, transport, executor, personas[index % len(personas)],
+                    script, seed, gap, participant, rounds)
+            else:
+                commands, errors, details = await run_greeting(
+                    address, transport, executor, verbose, timeout)
+        except Exception as e:
+            commands, errors, details = 0, 1, f"failed: {e}"
+        return address, commands, errors, time.monotonic() - started, details
+
+    try:
+        rows = await asyncio.gather(*(one(i, address) for i, address in enumerate(addresses)))
+    finally:
+        executor.shutdown(wait=False)
+        session.close()
+    return rows
+
+
+def print_fleet_summary(rows):
+    width = max([len("Robot")] + [len(row[0]) for row in rows])
+    print(f"\n{'Robot':<{width}}  {'Cmds':>4}  {'Errs':>4}  {'Time':>7}  Details")
+    for address, commands, errors, seconds, details in rows:
+        print(f"{address:<{width}}  {commands:>4}  {errors:>4}  {seconds:>6.1f}s  {details}")
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a session on many robots at once")
+    parser.add_argument("mode", choices=["memory", "greeting"])
+    parser.add_argument("robots", nargs="*", help=f"robot addresses (default: ${FLEET_ENV})")
+    parser.add_argument("--persona", default="1",
+                        help="persona number, or a list like 1,2 to alternate across robots")
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="wizard commands, ; separated")
+    parser.add_argument("--gap", type=float, default=WIZARD_GAP, help="s between commands")
+    parser.add_argument("--seed", default=None, help="generate sequences from this seed")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="end each game after this many rounds of a difficulty")
+    parser.add_argument("--participant", help="log every robot's session for this participant id")
+    parser.add_argument("--timeout", type=float, default=GREETING_TIMEOUT,
+                        help="s to wait for a head pat in greeting mode")
+    parser.add_argument("--sim", type=int, default=0, metavar="N",
+                        help="start N local mistySim robots and add them to the fleet")
+    parser.add_argument("--verbose", action="store_true",
+                        help="show each robot's wizard or greeting output")
+    args = parser.parse_args()
+
+    addresses = fleet_addresses(args.robots)
+    sims = []
+    if args.sim:
+        from mistySim import MistySim
+        scenario = "approach" if args.mode == "greeting" else "none"
+        sims = [MistySim(port=0, scenario=scenario, seed=i).start() for i in range(args.sim)]
+        addresses += [sim.address for sim in sims]
+    if not addresses:
+        parser.error(f"no robots given (list them or set {FLEET_ENV})")
+
+    try:
+        personas = [PERSONAS[int(number)] for number in args.persona.split(",")]
+    except (KeyError, ValueError):
+        parser.error("--persona takes numbers from " + ", ".join(map(str, PERSONAS)))
+
+    serve_metrics()
+    print_summary_at_exit()
+    print(f"Fleet of {len(addresses)} robots, mode {args.mode}")
+    started = time.monotonic()
+    sys.stdout = RobotOutput(sys.stdout, args.verbose)
+    try:
+        rows = asyncio.run(run_fleet(addresses, args.mode, personas, parse_script(args.script),
+                                     args.seed, args.gap, args.verbose, args.timeout,
+                                     args.participant, args.rounds))
+    finally:
+        sys.stdout = sys.stdout.stream
+        for sim in sims:
+            sim.stop()
+    print_fleet_summary(rows)
+    print(f"Fleet done in {time.monotonic() - started:.1f} s")
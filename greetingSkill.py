@@ -0,0 +1,399 @@
+import operator
+import threading
+import time
+from collections import namedtuple
+
+from fanOut import FanOut
+from mistyPy.Events import Events
+from tofFusion import TofFusion, sensor_condition
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+FACE_TIMEOUT = 8          # s since last face before ignoring ToF
+NEAR_PAT_FIRST_DELAY = 4  # s near before first pat request
+NEAR_PAT_SECOND_DELAY = 6 # s after first pat request before second
+FAR_SECOND_DELAY = 5      # s far before the second invitation
+
+# Range sensors fused into one "nearest person" distance. Only these are
+# subscribed, so Misty doesn't stream the others at all. Back is left
+# out: someone behind Misty can't see its face or screen.
+TOF_SENSORS = ("Center", "Left", "Right")
+
+# Smoothing of each ToF sensor before fusing: "median", "ema" or "reject"
+# (see tofFilter.compare to tune these on recorded readings)
+TOF_FILTER = "median"
+TOF_WINDOW = 5            # readings, ~1 s at the 200 ms debounce
+
+# Cooldowns (seconds) to stop speech spamming
+COOLDOWN_FAR_FIRST  = 6
+COOLDOWN_FAR_SECOND = 10
+COOLDOWN_MEDIUM     = 6
+COOLDOWN_NEAR_THANK = 6
+
+HEAD_SENSORS = {"HeadFront", "HeadBack", "HeadLeft", "HeadRight", "Scruff", "Chin"}
+
+
+# --------------------------------------
+# PLAN: distance zones with hysteresis
+# --------------------------------------
+# current zone -> rules (new zone, comparison, bound m), first match wins.
+# Leaving a zone needs a clearly larger move than entering it, which
+# avoids constant zone flipping around the boundaries.
+ZONE_RULES = {
+    None: [                       # first classification
+        ("far", ">", 1.5),
+        ("medium", ">", 0.7),
+        ("near", None, None),
+    ],
+    "near": [                     # stay NEAR until distance > 1.0
+        ("far", ">", 1.5),
+        ("medium", ">", 1.0),
+        ("near", None, None),
+    ],
+    "medium": [
+        ("far", ">", 1.7),
+        ("medium", ">=", 0.6),
+        ("near", None, None),
+    ],
+    "far": [                      # stay FAR until distance < 1.3
+        ("far", ">=", 1.3),
+        ("medium", ">=", 0.7),
+        ("near", None, None),
+    ],
+}
+
+_COMPARISONS = {">": operator.gt, ">=": operator.ge}
+
+
+def _compile_zone_rules(rules):
+    """Resolve the comparison names once, so classifying is a short loop."""
+    return {
+        zone: tuple(
+            (new_zone, _COMPARISONS[comparison] if comparison else None, bound)
+            for new_zone, comparison, bound in zone_rules
+        )
+        for zone, zone_rules in rules.items()
+    }
+
+
+ZONE_TABLE = _compile_zone_rules(ZONE_RULES)
+
+
+def get_zone_with_hysteresis(dist_meters, current_zone):
+    """Zone for this distance, given the zone we are in (None = no zone yet)."""
+    if dist_meters is None:
+        return current_zone
+    rules = ZONE_TABLE.get(current_zone)
+    if rules is None:
+        return current_zone
+    for new_zone, compare, bound in rules:
+        if compare is None or compare(dist_meters, bound):
+            return new_zone
+    return current_zone
+
+
+# --------------------------------------
+# ACT: what Misty shows for each reaction
+# --------------------------------------
+# cooldown: s before the line may be spoken again. If pose_in_cooldown is
+# False the whole reaction waits for the cooldown, otherwise only the line.
+Reaction = namedtuple("Reaction", "image led arms line cooldown pose_in_cooldown")
+
+REACTIONS = {
+    "far_first": Reaction(                        # friendly / attentive, both arms up-ish
+        "e_Amazement.jpg", (0, 0, 255), (80, 80),
+        "Come closer!", COOLDOWN_FAR_FIRST, False),
+    "far_second": Reaction(                       # slightly different friendly face
+        "e_Admiration.jpg", (0, 0, 255), (70, 70),
+        "Come on, come closer!", COOLDOWN_FAR_SECOND, False),
+    "medium": Reaction(                           # warm / inviting, one arm forward
+        "e_ContentRight.jpg", (255, 255, 0), (0, 80),
+        "Hello friend, have a seat!", COOLDOWN_MEDIUM, True),
+    "near": Reaction(                             # very friendly / joyful, both arms forward
+        "e_Joy2.jpg", (0, 255, 0), (-90, -90),
+        "Thank you for sitting down!", COOLDOWN_NEAR_THANK, True),
+    "pat_first": Reaction(                        # soft blue
+        "e_Admiration.jpg", (0, 128, 255), (40, 40),
+        "If you would like to begin, please give me a gentle pat on my head.", 0, False),
+    "pat_second": Reaction(                       # pinkish, extra friendly
+        "e_Joy.jpg", (255, 192, 203), (50, 50),
+        "Pretty please, could you pat my head?", 0, False),
+    "pat_thank_you": Reaction(                    # happy green
+        "e_JoyGoofy2.jpg", (0, 255, 0), (-80, -80),
+        "Thank you for patting my head! Let's begin the tasks.", 0, False),
+}
+
+
+# --------------------------------------
+# GREETING SKILL
+# --------------------------------------
+
+class GreetingSkill:
+    """
+    Invites a passer-by closer, asks them to sit and to pat Misty's head.
+
+    All state lives on the instance, so any number of skills can run in
+    one process, each bound to its own robot (or to a replayed recording,
+    see sensorRecorder). Sensor handlers must be called from one thread
+    at a time (see sensorActor); they take the event time as `now`.
+    """
+
+    def __init__(self, misty, name="", tof_sensors=TOF_SENSORS,
+                 tof_window=TOF_WINDOW, tof_filter=TOF_FILTER, verbose=True, session_log=None,
+                 executor=None):
+        self.misty = misty
+        self.executor = executor  # for FanOut groups; default: fanOut's shared pool
+        self.name = name
+        self.verbose = verbose
+        self.session_log = session_log  # optional sessionLog.SessionLog
+        self.tof_sensors = tuple(tof_sensors)
+        self.tof = TofFusion(self.tof_sensors, tof_window, tof_filter)
+        self.done = threading.Event()  # set once the head pat was received
+
+        self.last_face_time = None
+        self.last_spoken = {reaction: 0.0 for reaction in REACTIONS}
+        self.event_names = []
+        self._reset_state()
+
+        # zone -> method run when entering / while staying in that zone
+        self._on_enter = {"far": self._enter_far, "medium": self._enter_medium,
+                          "near": self._enter_near}
+        self._while_in = {"far": self._while_far, "near": self._while_near}
+
+    def _reset_state(self):
+        self.zone = None               # "far", "medium", "near"
+        self.far_since = None
+        self.far_second_done = False
+        self.near_since = None
+        self.asked_for_pat = False
+        self.pat_received = False
+        self.pat_prompt_time = None
+        self.second_pat_prompt_done = False
+        self.neutral_mode = True       # in neutral idle?
+
+    def log(self, *args):
+        if not self.verbose:
+            return
+        if self.name:
+            print(f"[{self.name}]", *args)
+        else:
+            print(*args)
+
+    # ------------- ACT -------------
+
+    def go_neutral(self):
+        self.log("Going to NEUTRAL state")
+        with FanOut(self.executor) as group:
+            group.add(self.misty.display_image, "e_DefaultContent.jpg")
+            group.add(self.misty.change_led, 0, 255, 0)     # green idle
+            group.add(self.misty.move_head, 0, 0, 0)
+            group.add(self.misty.move_arm, "left", 0, 50)   # arms down
+            group.add(self.misty.move_arm, "right", 0, 50)
+        self._reset_state()
+        self.tof.reset()   # old readings belong to whoever was here before
+
+    def react(self, name, now):
+        """Show a reaction (face, LED, arms, line) in one round trip; False if skipped."""
+        reaction = REACTIONS[name]
+        speak = now - self.last_spoken[name] >= reaction.cooldown
+        if not speak and not reaction.pose_in_cooldown:
+            return False  # cooldown: don't react again yet
+        if speak:
+            self.last_spoken[name] = now
+
+        left, right = reaction.arms
+        started = time.monotonic()
+        with FanOut(self.executor) as group:
+            if speak:
+                group.add(self.misty.speak, reaction.line, 1)
+            group.add(self.misty.display_image, reaction.image)
+            group.add(self.misty.change_led, *reaction.led)
+            group.add(self.misty.move_arm, "left", left, 50)
+            group.add(self.misty.move_arm, "right", right, 50)
+        if self.session_log is not None:
+            self.session_log.log("behavior", name, outcome="spoken" if speak else "pose",
+                                 latency_ms=(time.monotonic() - started) * 1000.0,
+                                 detail=self.zone or "")
+        return True
+
+    # ------------- ZONE TRANSITIONS -------------
+
+    def _enter_far(self, now):
+        self.far_since = now
+        self.far_second_done = False
+        if self.react("far_first", now):
+            self.log("Zone: FAR (first)")
+
+    def _enter_medium(self, now):
+        self.far_since = None
+        self.far_second_done = False
+        in_cooldown = now - self.last_spoken["medium"] < COOLDOWN_MEDIUM
+        self.log("Zone: MEDIUM (cooldown, no speech)" if in_cooldown else "Zone: MEDIUM")
+        self.react("medium", now)
+        self._reset_pat(None)
+
+    def _enter_near(self, now):
+        self.far_since = None
+        self.far_second_done = False
+        in_cooldown = now - self.last_spoken["near"] < COOLDOWN_NEAR_THANK
+        self.log("Zone: NEAR (cooldown, no speech)" if in_cooldown else "Zone: NEAR")
+        self.react("near", now)
+        self._reset_pat(now)
+
+    def _reset_pat(self, near_since):
+        self.near_since = near_since
+        self.asked_for_pat = False
+        self.pat_received = False
+        self.pat_prompt_time = None
+        self.second_pat_prompt_done = False
+
+    def _while_far(self, now):
+        # After some time far, second prompt
+        if self.far_since is not None and not self.far_second_done:
+            if now - self.far_since > FAR_SECOND_DELAY:
+                if self.react("far_second", now):
+                    self.log("Zone: FAR (second)")
+                self.far_second_done = True
+
+    def _while_near(self, now):
+        # Ask for a head pat over time
+        if self.near_since is None or self.pat_received:
+            return
+        if not self.asked_for_pat and now - self.near_since > NEAR_PAT_FIRST_DELAY:
+            self.log("Asking for head pat (first time)")
+            self.react("pat_first", now)
+            self.asked_for_pat = True
+            self.pat_prompt_time = now
+        elif (self.asked_for_pat and not self.second_pat_prompt_done
+              and self.pat_prompt_time is not None
+              and now - self.pat_prompt_time > NEAR_PAT_SECOND_DELAY):
+            self.log("Asking for head pat (second time)")
+            self.react("pat_second", now)
+            self.second_pat_prompt_done = True
+            self.pat_prompt_time = now
+
+    # ------------- SENSE -------------
+
+    def on_tof(self, data, now):
+        """
+        SENSE: fuse the ToF sensors into the nearest person.
+        PLAN: only act if a face was seen recently; decide zone with hysteresis.
+        ACT: trigger behaviours + pat prompts.
+        """
+        if self.done.is_set():
+            return
+
+        message = data["message"]
+        self.tof.update(message["sensorPosition"], message["distanceInMeters"], now)
+        nearest = self.tof.nearest(now)
+        if nearest is not None:
+            dist, bearing, sensor = nearest
+            self.log(f"Nearest person: {dist:.2f} m at {bearing:+.0f} deg ({sensor})")
+
+        # Face gate: ignore ToF if no recent face. Checked on every reading,
+        # fused or not, so Misty goes neutral when the readings dry up too.
+        if self.last_face_time is None:
+            return
+        if now - self.last_face_time > FACE_TIMEOUT:
+            if not self.neutral_mode:
+                self.go_neutral()
+            return
+        if nearest is None:
+            return
+        self.neutral_mode = False
+
+        new_zone = get_zone_with_hysteresis(dist, self.zone)
+        if new_zone != self.zone:
+            self.zone = new_zone
+            self._on_enter[new_zone](now)
+
+        # Extra logic while staying in the same zone
+        stay = self._while_in.get(self.zone)
+        if stay is not None:
+            stay(now)
+
+    def on_face(self, data, now):
+        if self.done.is_set():
+            return
+        self.last_face_time = now
+        if self.neutral_mode:
+            self.log("Face seen – ready to react to distance now.")
+        self.log("Face label:", data["message"].get("label", "unknown"))
+
+    def on_touch(self, data, now):
+        """Head pat while NEAR finishes the skill."""
+        if self.done.is_set():
+            return
+        message = data["message"]
+        if not message["isContacted"] or self.zone != "near" or self.pat_received:
+            return
+        if message["sensorPosition"] in HEAD_SENSORS:
+            self.log("Head pat received – thanking user")
+            self.react("pat_thank_you", now)
+            self.pat_received = True
+            self.finish()
+
+    # ------------- EVENTS -------------
+
+    def handlers(self):
+        """{event type: handler(data, now)}, e.g. for sensorRecorder.replay."""
+        return {
+            Events.TimeOfFlight: self.on_tof,
+            Events.FaceRecognition: self.on_face,
+            Events.TouchSensor: self.on_touch,
+        }
+
+    def register(self, actor, recorder=None):
+        """
+        Subscribe to the sensors; events go through the actor thread.
+        recorder: optional SensorRecorder that saves every event for replay.
+        """
+        prefix = f"{self.name}_" if self.name else ""
+
+        def subscribe(event_name, event_type, handler, debounce, condition=None, coalesce=None):
+            callback = actor.callback(handler, coalesce=coalesce)
+            if recorder is not None:
+                callback = recorder.tap(callback, event_type)
+            self.misty.register_event(
+                event_name=prefix + event_name,
+                event_type=event_type,
+                condition=condition,
+                callback_function=callback,
+                keep_alive=True,
+                debounce=debounce,
+            )
+            self.event_names.append(prefix + event_name)
+
+        # One subscription per sensor: Misty filters on its side, so sensors
+        # we don't use never cross the network.
+        for position in self.tof_sensors:
+            subscribe(f"distance_event_{position.lower()}", Events.TimeOfFlight,
+                      self.on_tof, 200, sensor_condition(position), coalesce=tof_sensor)
+
+        self.misty.start_face_recognition()
+        subscribe("face_event", Events.FaceRecognition, self.on_face, 1000)
+        subscribe("touch_event", Events.TouchSensor, self.on_touch, 250)
+
+    def finish(self):
+        """Stop face recognition and unregister every event of this skill."""
+        self.done.set()
+        try:
+            self.misty.stop_face_recognition()
+        except Exception as e:
+            print("Could not stop face recognition:", e)
+
+        for event_name in self.event_names:
+            try:
+                self.misty.unregister_event(event_name)
+            except Exception as e:
+                print(f"Could not unregister {event_name}:", e)
+        self.event_names = []
+        if self.session_log is not None:
+            self.session_log.log("session", "finished", outcome="head pat" if self.pat_received else "")
+        self.log("Skill finished after head pat.")
+
+
+def tof_sensor(data):
+    """Readings are only coalesced with newer ones from the same sensor."""
+    return (data.get("message") or {}).get("sensorPosition")
@@ -0,0 +1,174 @@
+import io
+import json
+import threading
+import uuid
+import zipfile
+
+from robotState import note_output
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+
+# Namespace for the skill GUIDs: the same sequence + timing always maps to
+# the same skill, so it is only uploaded once per robot.
+SKILL_NAMESPACE = uuid.UUID("6f1d6a52-8f0e-4a43-9a57-0b6f3c2f1e15")
+SKILL_PREFIX = "LedSeq_"
+SKILL_TIMEOUT = 120  # s, Misty cancels the skill after this
+
+
+# --------------------------------------
+# COMPILING A SEQUENCE
+# --------------------------------------
+
+def compile_steps(colors, on_time, white_time, final_rgb, white_rgb=(255, 255, 255)):
+    """
+    Turn a list of RGB tuples into (rgb, hold_ms) steps:
+    color for on_time, white for white_time, ... then final_rgb.
+    """
+    steps = []
+    for rgb in colors:
+        steps.append((tuple(rgb), int(round(on_time * 1000))))
+        steps.append((tuple(white_rgb), int(round(white_time * 1000))))
+    if not steps or steps[-1][0] != tuple(final_rgb):
+        steps.append((tuple(final_rgb), 0))
+    return steps
+
+
+def program_duration(steps):
+    """Seconds the program takes from its first LED edge to its last."""
+    return sum(hold_ms for _, hold_ms in steps) / 1000.0
+
+
+def skill_source(steps):
+    """JavaScript for a Misty skill that plays the steps on the robot."""
+    lines = []
+    for (r, g, b), hold_ms in steps:
+        lines.append(f"misty.ChangeLED({r}, {g}, {b});")
+        if hold_ms > 0:
+            lines.append(f"misty.Pause({hold_ms});")
+    return "\n".join(lines) + "\n"
+
+
+def skill_id(steps):
+    key = json.dumps(steps, separators=(",", ":"))
+    return str(uuid.uuid5(SKILL_NAMESPACE, key))
+
+
+def skill_package(steps):
+    """Zip (bytes) with the .js and .json meta file Misty expects."""
+    unique_id = skill_id(steps)
+    name = SKILL_PREFIX + unique_id.replace("-", "")[:12]
+    meta = {
+        "Name": name,
+        "UniqueId": unique_id,
+        "Description": "LED sequence generated by ledProgram.py",
+        "StartupRules": ["Manual", "Robot"],
+        "Language": "javascript",
+        "BroadcastMode": "off",
+        "TimeoutInSeconds": SKILL_TIMEOUT,
+        "CleanupOnCancel": False,
+        "WriteToLog": False,
+        "Parameters": {},
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr(name + ".js", skill_source(steps))
+        package.writestr(name + ".json", json.dumps(meta, indent=2))
+    return name, unique_id, buffer.getvalue()
+
+
+# --------------------------------------
+# UPLOADING + STARTING ON THE ROBOT
+# --------------------------------------
+
+class LedProgramLoader:
+    """
+    Keeps track of which LED skills are already on one robot.
+
+    The robot's skill list is fetched once; after that only sequences the
+    robot has never seen are uploaded.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self._known = None
+        self._lock = threading.Lock()
+
+    def _known_ids(self):
+        if self._known is None:
+            response = self.transport.get("skills")
+            skills = response.json().get("result") or []
+            self._known = {
+                skill.get("uniqueId") or skill.get("UniqueId") for skill in skills
+            }
+        return self._known
+
+    def ensure_uploaded(self, steps):
+        """Upload the skill for these steps unless the robot already has it."""
+        unique_id = skill_id(steps)
+        with self._lock:
+            if unique_id in self._known_ids():
+                return unique_id
+            name, unique_id, package = skill_package(steps)
+            self.transport.post(
+                "skills",
+                files={"File": (name + ".zip", package, "application/zip")},
+                data={"ImmediatelyApply": "false", "OverwriteExisting": "true"},
+            )
+            self._known.add(unique_id)
+            return unique_id
+
+    def start(self, steps):
+        """Start the program with a single request; returns its duration (s)."""
+        unique_id = self.ensure_uploaded(steps)
+        self.transport.post("skills/start", {"Skill": unique_id})
+        return program_duration(steps)
+
+    def cancel(self, steps):
+        """Stop the program for these steps if it is still running."""
+        self.transport.post("skills/cancel", {"Skill": skill_id(steps)})
+
+
+_loaders = {}
+_loaders_lock = threading.Lock()
+
+
+def get_loader(misty):
+    """Shared loader for the robot's transport (see mistyTransport)."""
+    transport = misty.transport
+    with _loaders_lock:
+        loader = _loaders.get(transport)
+        if loader is None:
+            loader = LedProgramLoader(transport)
+            _loaders[transport] = loader
+        return loader
+
+
+def play_led_program(misty, colors, on_time, white_time, final_rgb):
+    """
+    Compile the colors into one on-robot LED program and start it.
+
+    Returns the program duration in seconds; the LED timing itself runs
+    on Misty and does not depend on the host or the network.
+    """
+    steps = compile_steps(colors, on_time, white_time, final_rgb)
+    duration = get_loader(misty).start(steps)
+    # The LED keeps changing until the program ends
+    note_output(misty, "led", None)
+    return duration
+
+
+def cancel_led_program(misty, colors, on_time, white_time, final_rgb):
+    """Stop a program started by play_led_program (the LED stays where it was)."""
+    steps = compile_steps(colors, on_time, white_time, final_rgb)
+    get_loader(misty).cancel(steps)
+
+
+def preload_led_programs(misty, sequences, color_map, on_time, white_time, final_rgb):
+    """Upload every sequence up front so no round pays for an upload."""
+    loader = get_loader(misty)
+    for rounds in sequences.values():
+        for sequence in rounds:
+            colors = [color_map.get(name, color_map["white"]) for name in sequence]
+            loader.ensure_uploaded(compile_steps(colors, on_time, white_time, final_rgb))
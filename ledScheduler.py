@@ -0,0 +1,159 @@
+import statistics
+import threading
+import time
+import weakref
+
+from robotState import note_output, raw_robot
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+RTT_SAMPLES = 3      # LED commands timed before the first sequence
+RTT_SMOOTHING = 0.3  # weight of each new round trip in the running estimate
+START_MARGIN = 0.02  # s of slack before the first edge is due
+
+
+# --------------------------------------
+# TIMING REPORT
+# --------------------------------------
+
+class TimingReport:
+    """Intended vs. achieved time of every LED edge in one sequence."""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.edges = []  # (intended offset s, achieved offset s)
+        self.cancelled = False
+
+    def add(self, intended, achieved):
+        self.edges.append((intended, achieved))
+
+    @property
+    def errors(self):
+        return [achieved - intended for intended, achieved in self.edges]
+
+    @property
+    def max_error(self):
+        return max((abs(e) for e in self.errors), default=0.0)
+
+    @property
+    def mean_error(self):
+        errors = self.errors
+        return sum(abs(e) for e in errors) / len(errors) if errors else 0.0
+
+    @property
+    def end_drift(self):
+        errors = self.errors
+        return errors[-1] if errors else 0.0
+
+    def __str__(self):
+        return (
+            f"LED timing: {len(self.edges)} edges{' (cancelled)' if self.cancelled else ''}, "
+            f"mean error {self.mean_error * 1000:.0f} ms, "
+            f"max error {self.max_error * 1000:.0f} ms, "
+            f"end drift {self.end_drift * 1000:+.0f} ms "
+            f"(robot round trip {self.rtt * 1000:.0f} ms)"
+        )
+
+
+# --------------------------------------
+# SCHEDULER
+# --------------------------------------
+
+class LedScheduler:
+    """
+    Plays LED edges on absolute deadlines from a monotonic clock.
+
+    Each command is sent half a round trip early, so it lands on the robot
+    at its deadline. A slow call makes that one edge late but never pushes
+    the rest of the sequence back.
+    """
+
+    def __init__(self, misty):
+        self.misty = misty
+        # Timing probes repeat the current color on purpose, so they must
+        # bypass the ShadowRobot that would drop them.
+        self.robot = raw_robot(misty)
+        self.rtt = None
+        self._lock = threading.Lock()
+
+    def _send(self, rgb):
+        sent = time.monotonic()
+        self.robot.change_led(*rgb)
+        rtt = time.monotonic() - sent
+        if self.rtt is None:
+            self.rtt = rtt
+        else:
+            self.rtt += RTT_SMOOTHING * (rtt - self.rtt)
+        return sent, rtt
+
+    def measure_rtt(self, rgb, samples=RTT_SAMPLES):
+        """Time a few LED commands that don't change what Misty shows."""
+        rtts = [self._send(rgb)[1] for _ in range(samples)]
+        self.rtt = statistics.median(rtts)
+        return self.rtt
+
+    def play(self, steps, idle_rgb, cancel=None):
+        """
+        steps: (rgb, hold_ms) pairs, see ledProgram.compile_steps.
+        idle_rgb: what the LED shows right now, used to probe the round trip.
+        cancel: optional threading.Event; once set the LED goes back to
+                idle_rgb and the rest of the sequence is skipped.
+        Returns a TimingReport.
+        """
+        with self._lock:
+            if self.rtt is None:
+                self.measure_rtt(idle_rgb)
+
+            # Until the sequence ends we can't say what the LED shows (a
+            # failed edge leaves it on a sequence color)
+            note_output(self.misty, "led", None)
+            report = TimingReport(self.rtt)
+            start = time.monotonic() + self.rtt / 2 + START_MARGIN
+            offset = 0.0
+            for rgb, hold_ms in steps:
+                send_at = start + offset - self.rtt / 2
+                if _sleep_until(send_at, cancel):
+                    return self._cancelled(report, idle_rgb)
+                sent, rtt = self._send(rgb)
+                report.add(offset, sent + rtt / 2 - start)
+                offset += hold_ms / 1000.0
+
+            # Hold the last edge for its full duration like the old sleep did
+            if _sleep_until(start + offset, cancel):
+                return self._cancelled(report, idle_rgb)
+
+            report.rtt = self.rtt
+            note_output(self.misty, "led", tuple(steps[-1][0]))
+            return report
+
+    def _cancelled(self, report, idle_rgb):
+        self.robot.change_led(*idle_rgb)
+        note_output(self.misty, "led", tuple(idle_rgb))
+        report.rtt = self.rtt
+        report.cancelled = True
+        return report
+
+
+def _sleep_until(deadline, cancel=None):
+    """Sleep until the monotonic deadline; True if cancelled on the way."""
+    delay = deadline - time.monotonic()
+    if cancel is None:
+        if delay > 0:
+            time.sleep(delay)
+        return False
+    return cancel.wait(delay) if delay > 0 else cancel.is_set()
+
+
+_schedulers = weakref.WeakKeyDictionary()
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(misty):
+    """One scheduler (and round-trip estimate) per robot."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(misty)
+        if scheduler is None:
+            scheduler = LedScheduler(misty)
+            _schedulers[misty] = scheduler
+        return scheduler
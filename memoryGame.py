@@ -0,0 +1,657 @@
+import time
+STARTED = time.monotonic()  # process start, for the time-to-first-prompt report
+
+# Only what the menu needs is imported here; requests and mistyPy (see
+# mistyTransport), the metrics server, speech, LED timing, logging and the
+# preflight are imported where they are first used, off the prompt's path.
+import mistyTransport
+from robotState import ShadowRobot, note_output
+from personas import PERSONAS
+from sequenceGenerator import DIFFICULTY_SEQUENCES, FixedSequences, SequenceGenerator
+from wizardQueue import URGENT, CommandQueue, describe
+from fanOut import FanOut
+from resilience import offline_banner, offline_robots
+import argparse
+import os
+import threading
+import random
+
+# MISTY_IP=127.0.0.1:8080 points the game at mistySim.py instead
+ROBOT_IP = os.environ.get("MISTY_IP", "192.168.1.237")
+
+# Play LED sequences as one program on the robot (exact timing, one request)
+# instead of timing every color change from this laptop. Default for
+# MemoryGame(led_on_robot=...) and the wizard's --led-on-robot.
+LED_ON_ROBOT = False
+
+# Set (e.g. MISTY_SEQUENCE_SEED=42) to generate sequences for any difficulty
+# and round from this seed instead of using DIFFICULTY_SEQUENCES.
+SEQUENCE_SEED = os.environ.get("MISTY_SEQUENCE_SEED")
+
+# Set (e.g. MISTY_SEQUENCE_ROUNDS=20) to end the game after this many
+# rounds of a difficulty. Otherwise the fixed table ends after its last
+# round and generated sequences never run out (endurance sessions).
+SEQUENCE_ROUNDS = int(os.environ.get("MISTY_SEQUENCE_ROUNDS", 0)) or None
+
+# Background connect: wait before trying again after a failure, doubled
+# per failure up to the maximum (a robot still booting takes a minute)
+CONNECT_RETRY = 1.0
+CONNECT_RETRY_MAX = 30.0
+
+# -----------------------------
+# COLOR HELPERS
+# -----------------------------
+
+COLOR_MAP = {
+    "white":  (255, 255, 255),
+    "green":  (0, 255, 0),
+    "blue":   (0, 0, 255),
+    "red":    (255, 0, 0),
+    "yellow": (255, 255, 0),
+    "purple": (128, 0, 128),
+    "cyan":   (0, 255, 255),
+}
+
+def set_led(misty, color_name):
+    r, g, b = COLOR_MAP.get(color_name, COLOR_MAP["white"])
+    misty.change_led(r, g, b)
+
+def flash_sequence(misty, sequence, on_time=1.0, white_time=0.5, idle_rgb=None,
+                   on_robot=None, cancel=None):
+    """
+    sequence: list of color names, e.g. ["green", "blue", "blue"]
+    Between each color Misty goes back to white (*).
+    After sequence, returns to idle_rgb (the persona's idle color; defaults
+    to the first persona's).
+    on_robot: run the whole sequence as one LED program on Misty
+              (defaults to LED_ON_ROBOT).
+    Otherwise every LED edge is sent on an absolute, latency-compensated
+    deadline and a TimingReport (intended vs. achieved) is returned.
+    cancel: optional threading.Event that stops the sequence early.
+    """
+    if idle_rgb is None:
+        idle_rgb = PERSONAS[1].idle_led
+    if on_robot is None:
+        on_robot = LED_ON_ROBOT
+    from ledProgram import cancel_led_program, compile_steps, play_led_program
+
+    colors = [COLOR_MAP.get(name, COLOR_MAP["white"]) for name in sequence]
+
+    if on_robot:
+        duration = play_led_program(misty, colors, on_time, white_time, idle_rgb)
+        if cancel is not None and cancel.wait(duration):
+            cancel_led_program(misty, colors, on_time, white_time, idle_rgb)
+            misty.change_led(*idle_rgb)
+        elif cancel is None:
+            time.sleep(duration)
+        note_output(misty, "led", tuple(idle_rgb))
+        return None
+
+    from ledScheduler import get_scheduler
+
+    steps = compile_steps(colors, on_time, white_time, idle_rgb)
+    return get_scheduler(misty).play(steps, idle_rgb, cancel)
+
+
+# -----------------------------
+# EYE HELPERS
+# -----------------------------
+
+def show_random_eyes(misty, eye_list):
+    """Display a random eye image from the given list."""
+    filename = random.choice(eye_list)
+    misty.display_image(filename, 1)  # alpha=1 (fully opaque)
+
+
+def default_sequences(seed=SEQUENCE_SEED, rounds=SEQUENCE_ROUNDS):
+    """The fixed table, or a generator when a seed is given; at most `rounds` rounds."""
+    if seed is None:
+        return FixedSequences(DIFFICULTY_SEQUENCES, rounds)
+    return SequenceGenerator(seed, COLOR_MAP, rounds)
+
+
+def all_lines(persona):
+    """Every line a persona can say, round templates expanded (see speechCache)."""
+    for lines in persona.dialogue.values():
+        yield from lines
+    for difficulty, rounds in DIFFICULTY_SEQUENCES.items():
+        for round_number in range(1, len(rounds) + 1):
+            for template in persona.round_templates:
+                yield template.format(round=round_number, difficulty=difficulty)
+
+
+# -----------------------------
+# GAME ENGINE
+# -----------------------------
+
+class MemoryGame:
+    """
+    The memory game for any persona (see personas.py).
+
+    The robot connection, event subscriptions, speech cache and uploaded
+    LED programs belong to the game, not the persona, so set_persona()
+    switches condition between participants with no startup cost.
+
+    background=True connects on a separate thread so the wizard can show
+    its menu right away; `misty` and `speech` wait for the connection the
+    first time a command needs them. A failed background connect is
+    retried with backoff until the robot answers.
+
+    transport/executor: a MistyTransport and the worker threads for
+    FanOut groups, to share one pool between many games (see fleet.py).
+    """
+
+    def __init__(self, persona, ip=ROBOT_IP, sequences=None, session_log=None,
+                 background=False, led_on_robot=LED_ON_ROBOT, transport=None, executor=None):
+        self.ip = ip
+        self.transport = transport
+        self.executor = executor
+        self.led_on_robot = led_on_robot  # see LED_ON_ROBOT
+        # Optional sessionLog.SessionLog; every round, line and command goes in
+        self.session_log = session_log
+        self.sequences = sequences if sequences is not None else default_sequences()
+        # Set by the wizard's command queue to cut the running round short
+        self.cancel = threading.Event()
+        # (difficulty, round, sequence, time it ended) shown last, not scored yet
+        self.active_round = None
+        self.persona = persona
+        self.log("session", "persona")
+
+        self._misty = None
+        self._speech = None
+        self._attempted = threading.Event()  # first connect attempt is over
+        self._connected = threading.Event()
+        self._connect_error = None
+        self.background = background
+        self.connect_attempts = 0
+        self.connect_time = None  # s the connection and first LED/eyes took
+        if background:
+            threading.Thread(target=self._connect_until_up, name="misty-connect",
+                             daemon=True).start()
+        else:
+            self._connect()
+            self._require_connection()
+
+    # ------------- CONNECTION -------------
+
+    def _connect_until_up(self):
+        delay = CONNECT_RETRY
+        while not self._connect():
+            wait = random.uniform(delay / 2, delay)
+            print(f"\n{self.connection_banner()} Retrying in {wait:.0f} s.")
+            time.sleep(wait)
+            delay = min(delay * 2, CONNECT_RETRY_MAX)
+        if self.connect_attempts > 1:
+            print(f"\n*** Connected to Misty at {self.ip} "
+                  f"(attempt {self.connect_attempts}) ***")
+
+    def _connect(self):
+        """
+        Robot, speech events, speech cache and the persona's idle look, all
+        at once. Returns whether it worked.
+        """
+        from robotMetrics import instrument
+        from speechCache import SpeechCache
+        from speechPacing import SpeechPacer
+
+        started = time.monotonic()
+        self.connect_attempts += 1
+        speech = None
+        try:
+            misty = ShadowRobot(instrument(mistyTransport.PooledRobot(self.ip, self.transport)))
+            with FanOut(self.executor) as group:
+                speech = group.add(SpeechPacer, misty)
+                cache = group.add(SpeechCache.load, misty.transport)
+                self._show_persona(misty, group)
+            self._speech = speech.result()
+            self._speech.cache = cache.result()
+            self._misty = misty
+            # The shadow forgets everything on reconnect; show the idle look again
+            misty.transport.on_reconnect(lambda: self.show_persona(misty))
+        except Exception as e:
+            if speech is not None and speech.done() and speech.exception() is None:
+                speech.result().close()  # don't leave a subscription per attempt
+            self._connect_error = e
+            if not self.background:  # in the background the retry banner says it
+                print(f"Could not connect to Misty at {self.ip}:", e)
+            return False
+        finally:
+            self._attempted.set()
+        self._connect_error = None
+        self.connect_time = time.monotonic() - started
+        self._connected.set()
+        return True
+
+    def wait_ready(self, timeout=None):
+        """Wait for the connection; True once the robot can be used."""
+        return self._connected.wait(timeout)
+
+    def connection_banner(self):
+        """Operator warning while connecting keeps failing, else None."""
+        if self._connect_error is None:
+            return None
+        return f"*** NOT CONNECTED to Misty at {self.ip}: {self._connect_error} ***"
+
+    def _require_connection(self):
+        self._attempted.wait()
+        if not self._connected.is_set():
+            message = f"Not connected to Misty at {self.ip}"
+            if self.background:
+                message += " (retrying in the background)"
+            raise ConnectionError(message) from self._connect_error
+
+    @property
+    def misty(self):
+        self._require_connection()
+        return self._misty
+
+    @property
+    def speech(self):
+        self._require_connection()
+        return self._speech
+
+    # ------------- PERSONA -------------
+
+    def set_persona(self, persona):
+        """Switch condition; only the idle LED and eyes are re-sent."""
+        self.persona = persona
+        self.log("session", "persona")
+        self.show_persona(self.misty)
+
+    def show_persona(self, misty):
+        """Send the persona's idle look and wait for it."""
+        with FanOut(self.executor) as group:
+            self._show_persona(misty, group)
+
+    def _show_persona(self, misty, group):
+        # Neutral state: idle LED and eyes go out together, in the caller's
+        # group (FanOut groups on the shared pool must not nest)
+        if self.led_on_robot:
+            from ledProgram import preload_led_programs
+
+            group.add(preload_led_programs, misty, self.sequences.table, COLOR_MAP,
+                      1.0, 0.5, self.persona.idle_led)
+        group.add(misty.change_led, *self.persona.idle_led)
+        group.add(show_random_eyes, misty, self.persona.neutral_eyes)
+
+    def set_idle_led(self):
+        self.misty.change_led(*self.persona.idle_led)
+
+    def log(self, event, name="", **fields):
+        """Add a record to the session log, if there is one."""
+        if self.session_log is not None:
+            self.session_log.log(event, name, persona=self.persona.name, **fields)
+
+    def log_command(self, cmd, args, outcome, seconds):
+        """CommandQueue on_done hook: keypress-to-done time of every command."""
+        self.log("command", " ".join(str(x) for x in [cmd, *args]), outcome=outcome,
+                 latency_ms=seconds * 1000.0)
+
+    def _say(self, key, flush=None, line=None, idle_led=False):
+        """
+        Show the persona's eyes for this line while speaking one of its
+        lines (or `line`); idle_led also resets the LED. All of it goes out
+        at once, see fanOut. Returns the utterance id.
+        """
+        if line is None:
+            line = random.choice(self.persona.dialogue[key])
+        started = time.monotonic()
+        with FanOut(self.executor) as group:
+            group.add(show_random_eyes, self.misty, self.persona.eyes_for(key))
+            if idle_led:
+                group.add(self.set_idle_led)
+            utterance = group.add(self.speech.speak, line, self.persona.pitch, flush=flush)
+        self.log("say", key, latency_ms=(time.monotonic() - started) * 1000.0, detail=line)
+        return utterance.result()
+
+    # ------------- GAME LOGIC -------------
+
+    def doRound(self, difficulty, round_number):
+        """
+        Plays the LED sequence for a given difficulty and round.
+        Returns the LED TimingReport (None when the robot timed it itself).
+        """
+        if self.sequences.sequence(difficulty, 1) is None:
+            self.log("round", difficulty=difficulty, round=round_number, outcome="difficultyError")
+            self._say("difficultyError")
+            return
+
+        sequence = self.sequences.sequence(difficulty, round_number)
+        if sequence is None:
+            self.log("round", difficulty=difficulty, round=round_number, outcome="roundError")
+            self._say("roundError")
+            return
+
+        line = random.choice(self.persona.round_templates).format(
+            round=round_number, difficulty=difficulty
+        )
+
+        # Ensure we are in neutral state before speaking
+        utterance = self._say("doRound", line=line, idle_led=True)
+
+        from speechPacing import estimate_duration
+
+        timeout = max(self.persona.talk_delay, estimate_duration(line))
+        self.speech.wait(utterance, timeout=timeout, cancel=self.cancel)
+        report = None
+        if not self.cancel.is_set():
+            report = flash_sequence(self.misty, sequence, idle_rgb=self.persona.idle_led,
+                                    on_robot=self.led_on_robot, cancel=self.cancel)
+        if not self.cancel.is_set():
+            self.active_round = (difficulty, round_number, list(sequence), time.monotonic())
+        # latency_ms: mean LED edge error when timed from here
+        self.log("round", difficulty=difficulty, round=round_number, sequence=sequence,
+                 outcome="cancelled" if self.cancel.is_set() else "played",
+                 latency_ms=report.mean_error * 1000.0 if report is not None else None,
+                 detail=report or "")
+        return report
+
+    def scoreResponse(self, text):
+        """
+        Score the participant's answer (color initials) against the round
+        just shown, log it, and say playerCorrect + readyForNext, playerWon
+        after the last round, or playerLost. Returns the Score (None if
+        there is nothing to score).
+        """
+        from responseScoring import describe as describe_score, parse_answer, score
+
+        if self.active_round is None:
+            print("No round to score; play one with 2 <difficulty> <round> first.")
+            return None
+        difficulty, round_number, sequence, ended = self.active_round
+        try:
+            answer = parse_answer(text, COLOR_MAP)
+        except ValueError as e:
+            print(e)
+            return None
+        self.active_round = None
+
+        result = score(sequence, answer)
+        print(f"Answer {' '.join(answer) or '(none)'}: {describe_score(result)}")
+        # latency_ms: end of the sequence to the scored answer; detail holds
+        # the answer, the edit distance and position:kind:expected:given errors
+        self.log("response", "scored", difficulty=difficulty, round=round_number,
+                 sequence=sequence, outcome="correct" if result.correct else "wrong",
+                 latency_ms=(time.monotonic() - ended) * 1000.0,
+                 detail=f"answer={' '.join(answer)}; distance={result.distance}; errors=" + ",".join(
+                     f"{position}:{kind}:{expected or ''}:{given or ''}"
+                     for position, kind, expected, given in result.errors))
+
+        if not result.correct:
+            self.playerLost()
+        elif self.sequences.sequence(difficulty, round_number + 1) is None:
+            self.playerWon()
+        else:
+            utterance = self._say("playerCorrect")
+            self.speech.wait(utterance, cancel=self.cancel)
+            if not self.cancel.is_set():
+                self.readyForNext()
+        return result
+
+    # ------------- DIALOGUES -------------
+
+    def playerStart(self):
+        self._say("playerStart", line=self.persona.dialogue["playerStart"][0], idle_led=True)
+
+    def playerWon(self):
+        self._say("playerWon")
+
+    def playerCorrect(self):
+        self._say("playerCorrect")
+
+    def readyForNext(self):
+        self._say("readyForNext")
+
+    def playerLost(self):
+        self._say("playerLost")
+
+    def playAgainQuestion(self):
+        self._say("playAgainQuestion")
+
+    def whatDifficulty(self):
+        self._say("whatDifficulty")
+
+    # didntHear and goodbye can interrupt a round (see wizardQueue),
+    # so they also cut off whatever Misty is still saying
+
+    def didntHear(self):
+        self._say("didntHear", flush=True)
+
+    def waterBreak(self):
+        self._say("waterBreak")
+
+    def acknowledge(self):
+        self._say("acknowledge")
+
+    def goodbye(self):
+        self._say("goodbye", flush=True)
+
+
+# -----------------------------
+# WIZARD INTERFACE
+# -----------------------------
+
+# Wizard commands that just say a line: command -> dialogue method
+DIALOGUE_COMMANDS = {
+    1: "playerStart",
+    3: "playerCorrect",
+    4: "playerWon",
+    5: "playerLost",
+    6: "playAgainQuestion",
+    7: "whatDifficulty",
+    8: "didntHear",
+    9: "waterBreak",
+    11: "acknowledge",
+    99: "goodbye",
+}
+
+
+def run_command(game, cmd, args):
+    """Dispatch based on command + optional arguments."""
+    if cmd in DIALOGUE_COMMANDS:
+        getattr(game, DIALOGUE_COMMANDS[cmd])()
+
+    elif cmd == 2:
+        if len(args) < 2:
+            print("Usage: 2 <difficulty> <round>")
+            return
+        difficulty, round_number = args
+
+        if game.sequences.sequence(difficulty, 1) is None:
+            print(f"No sequences defined for difficulty {difficulty}.")
+            return
+
+        sequence = game.sequences.sequence(difficulty, round_number)
+        if sequence is None:
+            print(f"Round {round_number} is not defined for difficulty {difficulty}.")
+            return
+
+        # Print the correct sequence for the wizard
+        print(f"Difficulty {difficulty}, round {round_number}")
+        print("Correct sequence:", ", ".join(sequence))
+
+        # Then actually play the round on Misty
+        report = game.doRound(difficulty, round_number)
+        if report is not None:
+            print(report)
+
+    elif cmd == 12:
+        if not args:
+            print("Usage: 12 <answer as color initials>, e.g. 12 gbby")
+            return
+        game.scoreResponse(" ".join(str(x) for x in args))
+
+    elif cmd == 10:
+        persona = PERSONAS.get(args[0]) if args else None
+        if persona is None:
+            print("Usage: 10 <persona>  (" + ", ".join(
+                f"{number} = {p.name}" for number, p in PERSONAS.items()) + ")")
+            return
+        game.set_persona(persona)
+        print(f"Persona switched to {persona.name}.")
+
+    else:
+        print("Unknown command.")
+
+
+def print_menu(persona):
+    menu = persona.menu
+    print(f"\n=== {persona.title} Wizard Commands ===")
+    print(f"1: {menu[1]}")
+    print("2: Play round — 2 <difficulty> <round> (also prints sequence)")
+    for cmd in (3, 4, 5, 6, 7, 8, 9):
+        print(f"{cmd}: {menu[cmd]}")
+    print("10: Switch persona — 10 <persona> (" + ", ".join(
+        f"{number} = {p.name}" for number, p in PERSONAS.items()) + ")")
+    print(f"11: {menu[11]}")
+    print("12: Score answer — 12 <color initials>, e.g. 12 gbby (says the verdict itself)")
+    print(f"99: {menu[99]}")
+    print("q: Show running + queued commands")
+    print("c: Cancel running + queued commands")
+    print("p: Next participant — p <id> (logged to session_logs/)")
+    print("0: EXIT WIZARD MODE")
+    print("(" + ", ".join(str(cmd) for cmd in sorted(URGENT)) + " interrupt whatever is running)")
+
+
+def print_queue(queue, persona):
+    labels = {**persona.menu, 2: "Play round", 10: "Switch persona", 12: "Score answer"}
+    current, pending = queue.snapshot()
+    print("Running:", describe(current, labels) if current else "nothing")
+    for position, command in enumerate(pending, 1):
+        print(f"  {position}. {describe(command, labels)}")
+
+
+def set_participant(game, participant):
+    """Start logging for the next participant (opens the log on first use)."""
+    if game.session_log is None:
+        from sessionLog import open_session_log
+
+        game.session_log = open_session_log(participant, game.ip)
+    else:
+        game.session_log.participant = participant
+    game.log("session", "participant")
+
+
+def warm_up(game, checked):
+    """
+    Start the metrics server, wait for the background connection (however
+    long), then run the preflight; sets `checked` once it has reported.
+    """
+    from robotMetrics import print_summary_at_exit, serve_metrics
+    from preflight import preflight, remember_assets
+
+    serve_metrics()
+    print_summary_at_exit()
+    game.wait_ready()
+    print(f"Robot ready in {(time.monotonic() - STARTED) * 1000:.0f} ms "
+          f"(connect, speech and idle look {game.connect_time * 1000:.0f} ms)")
+    try:
+        # Assets, battery, volume and latency, before the participant sees anything
+        transport = game.misty.transport
+        if game.speech.cache is not None:
+            remember_assets(transport, "audio", game.speech.cache.on_robot)
+        preflight(transport)
+    finally:
+        checked.set()
+
+
+def after_preflight(checked):
+    """
+    run_command for the wizard queue that holds game commands until the
+    preflight has reported (PREFLIGHT_BUDGET after connecting at most).
+    Without a connection they are skipped at once as before; c stops the wait.
+    """
+    def dispatch(game, cmd, args):
+        if not checked.is_set():
+            game._require_connection()
+            print(f"Command {cmd} waits for the preflight report.")
+            while not checked.wait(0.1):
+                if game.cancel.is_set():
+                    return
+        run_command(game, cmd, args)
+
+    return dispatch
+
+
+def run_wizard(game):
+    """
+    The interactive wizard loop; one process serves any number of sessions.
+    Commands run in the background (see wizardQueue) so the prompt is
+    always ready for the next one.
+    """
+    if game.sequences.seed is not None:
+        print(f"Generated sequences, seed {game.sequences.seed}, "
+              + (f"{game.sequences.max_rounds} rounds" if game.sequences.max_rounds else "no round limit"))
+    checked = threading.Event()
+    queue = CommandQueue(game, after_preflight(checked), on_done=game.log_command)
+    # The robot may still be connecting; commands typed meanwhile queue up
+    threading.Thread(target=warm_up, args=(game, checked), name="warm-up", daemon=True).start()
+    first_prompt = True
+
+    while True:
+        print_menu(game.persona)
+        for robot in offline_robots():
+            print(offline_banner(robot))
+        banner = game.connection_banner()
+        if banner:
+            print(banner)
+        if first_prompt:
+            first_prompt = False
+            seconds = time.monotonic() - STARTED
+            from robotMetrics import METRICS  # usually imported by warm_up by now
+
+            METRICS.set_gauge("misty_wizard_first_prompt_seconds", round(seconds, 3),
+                              game.ip, "Process start to the first wizard prompt.")
+            print(f"Wizard ready in {seconds * 1000:.0f} ms")
+
+        line = input("> ").strip()
+        if not line:
+            continue
+
+        parts = line.split()
+        if parts[0].lower() == "q":
+            print_queue(queue, game.persona)
+            continue
+        if parts[0].lower() == "c":
+            queue.cancel()
+            print("Cancelled.")
+            continue
+        if parts[0].lower() == "p" and len(parts) == 2:
+            set_participant(game, parts[1])
+            print(f"Logging session records for participant {parts[1]}.")
+            continue
+
+        cmd = int(parts[0]) if parts[0].isdigit() else -1
+
+        if cmd == 0:
+            queue.close()
+            if game.wait_ready(0):
+                print(game.misty.report())
+            if game.session_log is not None:
+                game.session_log.close()
+            break
+
+        if cmd == 12:
+            args = parts[1:]  # the answer, as typed
+        else:
+            args = [int(x) for x in parts[1:] if x.isdigit()]
+        queue.submit(cmd, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory game wizard")
+    parser.add_argument("persona", type=int, nargs="?", default=1, choices=sorted(PERSONAS))
+    parser.add_argument("--seed", default=SEQUENCE_SEED,
+                        help="generate sequences from this seed instead of the fixed table")
+    parser.add_argument("--rounds", type=int, default=SEQUENCE_ROUNDS,
+                        help="end the game after this many rounds (default: the table's, "
+                             "no limit for generated sequences)")
+    parser.add_argument("--participant", help="log the session for this participant id")
+    parser.add_argument("--led-on-robot", action="store_true", default=LED_ON_ROBOT,
+                        help="play LED sequences as one program on the robot")
+    args = parser.parse_args()
+    game = MemoryGame(PERSONAS[args.persona], sequences=default_sequences(args.seed, args.rounds),
+                      background=True, led_on_robot=args.led_on_robot)
+    if args.participant:
+        set_participant(game, args.participant)
+    run_wizard(game)
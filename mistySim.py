@@ -0,0 +1,560 @@
+"""
+Local stand-in for Misty, so the scripts can run without the robot.
+
+    python mistySim.py --port 8080 --latency normal:0.04,0.015 --loss 0.02
+    MISTY_IP=127.0.0.1:8080 python memoryAuthoritative.py
+
+Implements the REST endpoints our scripts use and the /pubsub websocket
+(TimeOfFlight, FaceRecognition, TouchSensor, TextToSpeechComplete,
+AudioPlayComplete). A scripted visitor walks up to the robot, is seen by
+face recognition and pats its head, so test.py has something to react to.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zipfile
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+DEFAULT_PORT = 8080
+WS_MAGIC = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+TOF_RATE = 5.0          # ToF readings per second per sensor
+TOF_NOISE = 0.03        # m, standard deviation of the distance noise
+TTS_WORDS_PER_MIN = 150
+
+# Misty's built-in eye images
+SYSTEM_IMAGES = [
+    "e_Admiration.jpg", "e_Aggressiveness.jpg", "e_Amazement.jpg", "e_Anger.jpg",
+    "e_ApprehensionConcerned.jpg", "e_Contempt.jpg", "e_ContentLeft.jpg",
+    "e_ContentRight.jpg", "e_DefaultContent.jpg", "e_Disgust.jpg", "e_Disoriented.jpg",
+    "e_EcstacyHilarious.jpg", "e_EcstacyStarryEyed.jpg", "e_Fear.jpg", "e_Grief.jpg",
+    "e_Joy.jpg", "e_Joy2.jpg", "e_JoyGoofy.jpg", "e_JoyGoofy2.jpg", "e_JoyGoofy3.jpg",
+    "e_Love.jpg", "e_Rage.jpg", "e_Rage2.jpg", "e_Rage3.jpg", "e_Rage4.jpg",
+    "e_RemorseShame.jpg", "e_Sadness.jpg", "e_Sleeping.jpg", "e_SleepingZZZ.jpg",
+    "e_Sleepy.jpg", "e_Sleepy2.jpg", "e_Sleepy3.jpg", "e_Sleepy4.jpg", "e_Surprise.jpg",
+    "e_SystemBlack.jpg", "e_SystemBlinkLarge.jpg", "e_SystemBlinkStandard.jpg",
+    "e_SystemCamera.jpg", "e_SystemFlash.jpg", "e_SystemGearPrompt.jpg",
+    "e_SystemLogoPrompt.jpg", "e_Terror.jpg", "e_Terror2.jpg", "e_TerrorLeft.jpg",
+    "e_TerrorRight.jpg",
+]
+
+# Commands that change what a participant sees or hears
+OUTPUT_ENDPOINTS = {
+    "led", "led/transition", "images/display", "tts/speak", "arms", "head",
+    "audio/play", "skills/start",
+}
+
+
+# --------------------------------------
+# NETWORK CONDITIONS
+# --------------------------------------
+
+class Latency:
+    """
+    Round-trip delay added to every REST call.
+    spec: "fixed:S", "uniform:LO,HI", "normal:MEAN,SD" or "lognormal:MEDIAN,SIGMA"
+    """
+
+    def __init__(self, spec="fixed:0", rng=None):
+        self.rng = rng or random.Random()
+        kind, _, args = spec.partition(":")
+        self.kind = kind
+        self.args = [float(x) for x in args.split(",") if x]
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self):
+        if self.kind == "fixed":
+            value = self.args[0] if self.args else 0.0
+        elif self.kind == "uniform":
+            value = self.rng.uniform(*self.args)
+        elif self.kind == "normal":
+            value = self.rng.gauss(*self.args)
+        else:
+            median, sigma = self.args
+            value = self.rng.lognormvariate(0, sigma) * median
+        return max(0.0, value)
+
+
+# --------------------------------------
+# WEBSOCKET (just enough for /pubsub)
+# --------------------------------------
+
+def _read_frame(rfile):
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None, b""
+    opcode = head[0] & 0x0F
+    length = head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", rfile.read(8))[0]
+    mask = rfile.read(4) if head[1] & 0x80 else None
+    payload = rfile.read(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+def _frame(opcode, payload):
+    length = len(payload)
+    if length < 126:
+        header = struct.pack(">BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+class Subscriber:
+    """One /pubsub websocket and the events registered on it."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.subscriptions = {}  # event name -> [type, debounce s, conditions, last sent]
+        self.lock = threading.Lock()
+        self.open = True
+
+    def send(self, message):
+        data = _frame(0x1, json.dumps(message).encode("utf-8"))
+        with self.lock:
+            if not self.open:
+                return
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except (OSError, ValueError):  # ValueError: handler already closed the file
+                self.open = False
+
+    def deliver(self, event_type, message, now):
+        for name, sub in list(self.subscriptions.items()):
+            sub_type, debounce, conditions, last = sub
+            if sub_type != event_type or now - last < debounce:
+                continue
+            if not _matches(message, conditions):
+                continue
+            sub[3] = now
+            self.send({"eventName": name, "message": message})
+
+
+def _matches(message, conditions):
+    lowered = {key.lower(): value for key, value in message.items()}
+    for condition in conditions or []:
+        value = lowered.get(str(condition.get("Property", "")).lower())
+        wanted = condition.get("Value")
+        inequality = condition.get("Inequality", "=")
+        if inequality in ("=", "==") and str(value) != str(wanted):
+            return False
+        if inequality == "!=" and str(value) == str(wanted):
+            return False
+    return True
+
+
+# --------------------------------------
+# SIMULATED ROBOT
+# --------------------------------------
+
+class MistySim:
+    """
+    The simulated robot: output state, a log of every command, event
+    subscribers and the network conditions applied to REST calls.
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, latency="fixed:0",
+                 loss=0.0, rto=0.3, drop=0.0, tts_startup=0.1,
+                 tts_wpm=TTS_WORDS_PER_MIN, scenario="approach", seed=None):
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+        self.latency = Latency(latency, self.random)
+        self.loss = loss
+        self.rto = rto
+        self.drop = drop
+        self.tts_startup = tts_startup
+        self.tts_wpm = tts_wpm
+        self.scenario = scenario
+
+        self.state = {"led": (0, 0, 0), "image": None, "arms": {}, "head": (0, 0, 0)}
+        self.images = set(SYSTEM_IMAGES)
+        self.audio = set()
+        self.skills = {}  # unique id -> list of (rgb, pause ms)
+        self.skill_cancel = threading.Event()  # of the skill running now
+        self.face_recognition = False
+        self.log = []     # (monotonic time, method, endpoint, payload)
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self._stop = threading.Event()
+        self.server = None
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    # ------------- LIFECYCLE -------------
+
+    def start(self):
+        """Serve in background threads; returns self."""
+        class Handler(MistyHandler):
+            pass
+        Handler.sim = self
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        if self.scenario != "none":
+            threading.Thread(target=self._run_scenario, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def reset_log(self):
+        with self.lock:
+            self.log = []
+
+    def calls_since(self, since):
+        with self.lock:
+            return [entry for entry in self.log if entry[0] >= since]
+
+    def first_output_since(self, since):
+        """Time of the first command a participant would notice, or None."""
+        for t, method, endpoint, _ in self.calls_since(since):
+            if method != "GET" and endpoint in OUTPUT_ENDPOINTS:
+                return t
+        return None
+
+    # ------------- EVENTS -------------
+
+    def publish(self, event_type, message):
+        now = time.monotonic()
+        for subscriber in list(self.subscribers):
+            if subscriber.open:
+                subscriber.deliver(event_type, message, now)
+            else:
+                self.subscribers.discard(subscriber)
+
+    def _later(self, delay, event_type, message):
+        timer = threading.Timer(delay, self.publish, (event_type, message))
+        timer.daemon = True
+        timer.start()
+
+    # ------------- COMMANDS -------------
+
+    def handle(self, method, endpoint, body):
+        """Apply one REST call; returns (HTTP status, result)."""
+        with self.lock:
+            self.log.append((time.monotonic(), method, endpoint, body))
+        lowered = {key.lower(): value for key, value in body.items()} if isinstance(body, dict) else {}
+
+        if method == "GET":
+            if endpoint == "images/list":
+                return 200, [{"name": name, "systemAsset": name in SYSTEM_IMAGES}
+                             for name in sorted(self.images)]
+            if endpoint == "audio/list":
+                return 200, [{"name": name, "systemAsset": False} for name in sorted(self.audio)]
+            if endpoint == "skills":
+                return 200, [{"uniqueId": unique_id} for unique_id in self.skills]
+            if endpoint == "battery":
+                return 200, {"chargePercent": 0.87, "isCharging": False, "voltage": 8.1}
+            if endpoint == "device":
+                return 200, {"robotId": "sim", "outputCapabilities": [], "volume": 60}
+            return 404, f"Unknown endpoint {endpoint}"
+
+        if endpoint == "led":
+            self.state["led"] = (lowered.get("red"), lowered.get("green"), lowered.get("blue"))
+        elif endpoint == "led/transition":
+            self.state["led"] = (lowered.get("red"), lowered.get("green"), lowered.get("blue"))
+        elif endpoint == "images/display":
+            name = lowered.get("filename")
+            if name not in self.images and not lowered.get("isurl"):
+                return 400, f"Image {name} not found"
+            self.state["image"] = name
+        elif endpoint == "images/settings":
+            pass
+        elif endpoint == "arms":
+            self.state["arms"][str(lowered.get("arm")).lower()] = lowered.get("position")
+        elif endpoint == "head":
+            self.state["head"] = (lowered.get("pitch"), lowered.get("roll"), lowered.get("yaw"))
+        elif endpoint == "tts/speak":
+            text = re.sub(r"<[^>]+>", "", str(lowered.get("text") or ""))
+            duration = self.tts_startup + len(text.split()) / self.tts_wpm * 60
+            self._later(duration, "TextToSpeechComplete", {
+                "utteranceId": lowered.get("utteranceid"), "utterance": text,
+            })
+        elif endpoint == "audio/play":
+            name = lowered.get("assetid")
+            if name not in self.audio:
+                return 400, f"Audio {name} not found"
+            self._later(1.0, "AudioPlayComplete", {"metaData": {"name": name}})
+        elif endpoint in ("audio/stop", "tts/stop"):
+            pass
+        elif endpoint == "audio":
+            self.audio.add(lowered.get("filename"))
+        elif endpoint == "images":
+            self.images.add(lowered.get("filename"))
+        elif endpoint == "audio/volume":
+            pass
+        elif endpoint == "skills":
+            self._install_skill(body)
+        elif endpoint == "skills/start":
+            steps = self.skills.get(lowered.get("skill"))
+            if steps is None:
+                return 400, "Skill not found"
+            self.skill_cancel.set()
+            self.skill_cancel = threading.Event()
+            threading.Thread(target=self._run_skill, args=(steps, self.skill_cancel),
+                             daemon=True).start()
+        elif endpoint == "skills/cancel":
+            self.skill_cancel.set()
+        elif endpoint == "faces/recognition/start":
+            self.face_recognition = True
+        elif endpoint == "faces/recognition/stop":
+            self.face_recognition = False
+        else:
+            return 404, f"Unknown endpoint {endpoint}"
+        return 200, True
+
+    def _install_skill(self, body):
+        package = zipfile.ZipFile(BytesIO(body["File"]))
+        meta, source = {}, ""
+        for name in package.namelist():
+            if name.endswith(".json"):
+                meta = json.loads(package.read(name))
+            elif name.endswith(".js"):
+                source = package.read(name).decode("utf-8")
+        steps = []
+        for call, args in re.findall(r"misty\.(ChangeLED|Pause)\(([^)]*)\)", source):
+            values = [int(x) for x in args.split(",")]
+            if call == "ChangeLED":
+                steps.append([tuple(values), 0])
+            elif steps:
+                steps[-1][1] += values[0]
+        self.skills[meta.get("UniqueId")] = steps
+
+    def _run_skill(self, steps, cancel):
+        for rgb, pause_ms in steps:
+            self.state["led"] = rgb
+            with self.lock:
+                self.log.append((time.monotonic(), "SKILL", "led", {"rgb": rgb}))
+            if cancel.wait(pause_ms / 1000.0):
+                return
+
+    # ------------- SCRIPTED VISITOR -------------
+
+    def _visitor_distance(self, t):
+        """approach: walk in from 2.5 m, sit at 0.5 m, leave after 40 s."""
+        cycle = t % 60.0
+        if cycle < 5:
+            return None
+        if cycle < 20:
+            return 2.5 - (cycle - 5) / 15.0 * 2.0
+        if cycle < 40:
+            return 0.5
+        if cycle < 48:
+            return 0.5 + (cycle - 40) / 8.0 * 2.5
+        return None
+
+    def _run_scenario(self):
+        sensors = {"Center": 0.0, "Left": 0.25, "Right": 0.35, "Back": None}
+        period = 1.0 / TOF_RATE
+        last_face = last_touch = -10.0
+        while not self._stop.wait(period):
+            t = time.monotonic() - self.started
+            distance = self._visitor_distance(t) if self.scenario == "approach" else None
+            for position, offset in sensors.items():
+                value = 3.0 if distance is None or offset is None else distance + offset
+                value = max(0.05, value + self.random.gauss(0, TOF_NOISE))
+                self.publish("TimeOfFlight", {
+                    "sensorPosition": position, "distanceInMeters": round(value, 3),
+                    "status": 0, "created": time.time(),
+                })
+            if distance is not None and distance < 3.0 and self.face_recognition and t - last_face > 1.0:
+                last_face = t
+                self.publish("FaceRecognition", {"label": "unknown person", "confidence": 0.9})
+            if distance is not None and distance < 0.6 and (t % 60.0) > 32 and t - last_touch > 3.0:
+                last_touch = t
+                self.publish("TouchSensor", {"sensorPosition": "HeadFront", "isContacted": True})
+
+
+# --------------------------------------
+# HTTP HANDLER
+# --------------------------------------
+
+class MistyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real robot
+    disable_nagle_algorithm = True
+    sim = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            message = BytesParser(policy=HTTP).parsebytes(
+                b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + raw
+            )
+            fields = {}
+            for part in message.iter_parts():
+                name = part.get_param("name", header="content-disposition")
+                fields[name] = part.get_payload(decode=True)
+            return fields
+        if raw:
+            try:
+                return json.loads(raw)
+            except ValueError:
+                return {}
+        return {}
+
+    def _reply(self, status, result):
+        ok = status == 200
+        payload = {"result": result if ok else None, "status": "Success" if ok else "Failed"}
+        if not ok:
+            payload["error"] = result
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _serve(self, method):
+        sim = self.sim
+        body = self._body() if method != "GET" else {}
+        if self.path.startswith("/sim/"):
+            return self._control(method)
+
+        endpoint = self.path.split("?", 1)[0][len("/api/"):].strip("/")
+        delay = sim.latency.sample()
+        if sim.random.random() < sim.loss:
+            delay += sim.rto  # one lost segment = one retransmission timeout
+        time.sleep(delay / 2)
+        if sim.random.random() < sim.drop:
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        status, result = sim.handle(method, endpoint, body)
+        time.sleep(delay / 2)
+        self._reply(status, result)
+
+    def _control(self, method):
+        if self.path == "/sim/log":
+            with self.sim.lock:
+                entries = [
+                    {"t": t - self.sim.started, "method": m, "endpoint": e}
+                    for t, m, e, _ in self.sim.log
+                ]
+            return self._reply(200, entries)
+        if self.path == "/sim/state":
+            return self._reply(200, {k: v for k, v in self.sim.state.items()})
+        if self.path == "/sim/reset" and method == "POST":
+            self.sim.reset_log()
+            return self._reply(200, True)
+        return self._reply(404, "Unknown control endpoint")
+
+    def do_GET(self):
+        if self.path.startswith("/pubsub") and self.headers.get("Upgrade", "").lower() == "websocket":
+            return self._websocket()
+        self._serve("GET")
+
+    def do_POST(self):
+        self._serve("POST")
+
+    def do_DELETE(self):
+        self._serve("DELETE")
+
+    def _websocket(self):
+        key = self.headers["Sec-WebSocket-Key"] + WS_MAGIC
+        accept = base64.b64encode(hashlib.sha1(key.encode()).digest()).decode()
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+
+        subscriber = Subscriber(self.wfile)
+        self.sim.subscribers.add(subscriber)
+        try:
+            while subscriber.open:
+                opcode, payload = _read_frame(self.rfile)
+                if opcode is None or opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    with subscriber.lock:
+                        self.wfile.write(_frame(0xA, payload))
+                        self.wfile.flush()
+                elif opcode == 0x1:
+                    self._ws_message(subscriber, json.loads(payload))
+        except (OSError, ValueError):
+            pass
+        finally:
+            subscriber.open = False
+            self.sim.subscribers.discard(subscriber)
+            self.close_connection = True
+
+    def _ws_message(self, subscriber, message):
+        name = message.get("EventName")
+        if message.get("Operation") == "subscribe":
+            subscriber.subscriptions[name] = [
+                message.get("Type"),
+                (message.get("DebounceMs") or 0) / 1000.0,
+                message.get("EventConditions"),
+                0.0,
+            ]
+            subscriber.send({"eventName": name, "message": "Registration Status: API event registered."})
+        elif message.get("Operation") == "unsubscribe":
+            subscriber.subscriptions.pop(name, None)
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Misty stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="fixed:S | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--loss", type=float, default=0.0,
+                        help="chance a call loses a packet and waits one --rto")
+    parser.add_argument("--rto", type=float, default=0.3, help="retransmission timeout (s)")
+    parser.add_argument("--drop", type=float, default=0.0,
+                        help="chance a call's connection is reset without a reply")
+    parser.add_argument("--tts-startup", type=float, default=0.1,
+                        help="synthesis delay before speech starts (s)")
+    parser.add_argument("--tts-wpm", type=float, default=TTS_WORDS_PER_MIN,
+                        help="speaking rate; lower it for a slow-TTS robot")
+    parser.add_argument("--scenario", choices=["approach", "idle", "none"], default="approach")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    sim = MistySim(args.host, args.port, args.latency, args.loss, args.rto, args.drop,
+                   args.tts_startup, args.tts_wpm, args.scenario, args.seed).start()
+    print(f"Simulated Misty on {sim.address}  (MISTY_IP={sim.address})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        sim.stop()
@@ -0,0 +1,281 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import resilience
+
+# requests, mistyPy and asyncio are imported on first use, so the wizard
+# menu doesn't wait for their import (see PooledRobot below).
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+CONNECT_TIMEOUT = 2.0   # s to open the TCP connection
+READ_TIMEOUT = 5.0      # s to wait for Misty's reply
+POOL_SIZE = 8           # keep-alive connections kept open per robot
+
+
+# --------------------------------------
+# SHARED HTTP TRANSPORT
+# --------------------------------------
+
+class MistyTransport:
+    """
+    One keep-alive HTTP session per robot.
+
+    Every REST command reuses a pooled connection instead of opening a
+    new TCP connection, and every call has a timeout so a dropped robot
+    can't hang the caller forever.
+    """
+
+    def __init__(self, robot_ip, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 pool_size=POOL_SIZE, session=None, executor=None):
+        """
+        session/executor: share one connection pool and one set of worker
+        threads between many robots (see shared_pool); they are then left
+        open by close().
+        """
+        self.robot_ip = robot_ip
+        self.base_url = f"http://{robot_ip}/api/"
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self._owns_session = session is None
+        self.session = session if session is not None else _new_session(1, pool_size)
+
+        self._owns_executor = executor is None
+        self._executor = executor
+        self._executor_lock = threading.Lock()
+
+        # Set by robotMetrics.instrument() to time every call
+        self.metrics = None
+
+        # Marks the robot offline after repeated network failures and
+        # probes it in the background until it answers (see resilience)
+        self.breaker = resilience.CircuitBreaker(
+            robot_ip, self._probe, on_change=self._online_changed)
+        self._reconnect_hooks = []
+
+    def request(self, method, endpoint, json=None, params=None, timeout=None, **kwargs):
+        """
+        Send one REST call, raise on HTTP errors and return the response.
+        Network failures are retried where that is safe and all attempts
+        share one deadline; RobotOffline is raised without sending while
+        the robot is offline.
+        """
+        endpoint = endpoint.strip("/")
+        deadline = None if timeout is None else resilience.longest(timeout)
+        attempt = partial(self._attempt, method, endpoint, json, params, **kwargs)
+        return resilience.call(attempt, method, endpoint, timeout or self.timeout,
+                               self.breaker, deadline)
+
+    def _attempt(self, method, endpoint, json, params, timeout, **kwargs):
+        if self.metrics is None:
+            return self._send(method, endpoint, json, params, timeout, **kwargs)
+        with self.metrics.track(self.robot_ip, endpoint):
+            return self._send(method, endpoint, json, params, timeout, **kwargs)
+
+    def _probe(self):
+        self._send("GET", resilience.PROBE_ENDPOINT, None, None, resilience.PROBE_TIMEOUT)
+
+    def on_reconnect(self, callback):
+        """Call callback() (in registration order) each time the robot is back online."""
+        self._reconnect_hooks.append(callback)
+
+    def _online_changed(self, online, down_for):
+        resilience.announce(self.robot_ip, online, down_for)
+        if self.metrics is not None:
+            self.metrics.set_gauge("misty_robot_online", int(online), self.robot_ip,
+                                   "1 while the robot answers, 0 while its circuit breaker is open.")
+        if not online:
+            return
+        for callback in list(self._reconnect_hooks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Could not restore robot {self.robot_ip} after reconnecting:", e)
+
+    @property
+    def online(self):
+        return self.breaker.online
+
+    def _send(self, method, endpoint, json, params, timeout, **kwargs):
+        url = self.base_url + endpoint.lstrip("/")
+        response = self.session.request(
+            method, url, json=json, params=params,
+            timeout=timeout or self.timeout, **kwargs
+        )
+        response.raise_for_status()
+        return response
+
+    def get(self, endpoint, params=None, timeout=None, **kwargs):
+        return self.request("GET", endpoint, params=params, timeout=timeout, **kwargs)
+
+    def post(self, endpoint, json=None, timeout=None, **kwargs):
+        return self.request("POST", endpoint, json=json, timeout=timeout, **kwargs)
+
+    def delete(self, endpoint, json=None, timeout=None, **kwargs):
+        return self.request("DELETE", endpoint, json=json, timeout=timeout, **kwargs)
+
+    # ------------- ASYNCIO FRONT END -------------
+
+    @property
+    def executor(self):
+        """Worker threads for the asyncio front end, one per pooled connection."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size,
+                    thread_name_prefix=f"misty-{self.robot_ip}",
+                )
+            return self._executor
+
+    async def request_async(self, method, endpoint, json=None, params=None,
+                            timeout=None, **kwargs):
+        """Same as request(), but awaitable from an asyncio event loop."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        call = partial(self.request, method, endpoint, json=json, params=params,
+                       timeout=timeout, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+
+    async def get_async(self, endpoint, params=None, timeout=None, **kwargs):
+        return await self.request_async("GET", endpoint, params=params, timeout=timeout, **kwargs)
+
+    async def post_async(self, endpoint, json=None, timeout=None, **kwargs):
+        return await self.request_async("POST", endpoint, json=json, timeout=timeout, **kwargs)
+
+    def close(self):
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._owns_session:
+            self.session.close()
+
+
+def _new_session(pool_connections, pool_size):
+    """requests Session keeping pool_size connections to each of pool_connections hosts."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    return session
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(robot_ip):
+    """Return the shared transport for this robot, creating it on first use."""
+    with _transports_lock:
+        transport = _transports.get(robot_ip)
+        if transport is None:
+            transport = MistyTransport(robot_ip)
+            _transports[robot_ip] = transport
+        return transport
+
+
+def shared_pool(robots, pool_size=POOL_SIZE, workers=None):
+    """
+    (session, executor) for driving many robots from one process: one
+    keep-alive pool per robot inside a single Session, and one bounded
+    set of worker threads for all of their blocking calls.
+    """
+    session = _new_session(max(1, robots), pool_size)
+    executor = ThreadPoolExecutor(
+        max_workers=workers or min(64, max(4, robots * 2)),
+        thread_name_prefix="misty-fleet",
+    )
+    return session, executor
+
+
+def _without_none(payload):
+    return {key: value for key, value in payload.items() if value is not None}
+
+
+# --------------------------------------
+# ROBOT USING THE SHARED TRANSPORT
+# --------------------------------------
+
+def _pooled_robot_class():
+    from mistyPy.Robot import Robot
+
+    class PooledRobot(Robot):
+        """
+        Drop-in replacement for mistyPy's Robot.
+
+        The commands our scripts use are sent through the shared
+        MistyTransport; everything else (events, keep_alive, ...) is
+        inherited unchanged.
+        """
+
+        def __init__(self, ip, transport=None):
+            super().__init__(ip)
+            self.transport = transport or get_transport(ip)
+
+        def change_led(self, red=None, green=None, blue=None):
+            return self.transport.post("led", _without_none({
+                "red": red, "green": green, "blue": blue,
+            }))
+
+        def display_image(self, fileName=None, alpha=None, layer=None, isURL=None):
+            return self.transport.post("images/display", _without_none({
+                "FileName": fileName, "Alpha": alpha, "Layer": layer, "IsURL": isURL,
+            }))
+
+        def speak(self, text=None, pitch=None, speechRate=None, voice=None,
+                  flush=None, utteranceId=None, language=None):
+            return self.transport.post("tts/speak", _without_none({
+                "Text": text, "Pitch": pitch, "SpeechRate": speechRate, "Voice": voice,
+                "Flush": flush, "UtteranceId": utteranceId, "Language": language,
+            }))
+
+        def move_arm(self, arm=None, position=None, velocity=None, units=None, duration=None):
+            return self.transport.post("arms", _without_none({
+                "Arm": arm, "Position": position, "Velocity": velocity,
+                "Units": units, "Duration": duration,
+            }))
+
+        def move_head(self, pitch=None, roll=None, yaw=None, velocity=None,
+                      units=None, duration=None):
+            return self.transport.post("head", _without_none({
+                "Pitch": pitch, "Roll": roll, "Yaw": yaw, "Velocity": velocity,
+                "Units": units, "Duration": duration,
+            }))
+
+        def play_audio(self, fileName=None, volume=None):
+            return self.transport.post("audio/play", _without_none({
+                "AssetId": fileName, "Volume": volume,
+            }))
+
+        def stop_audio(self):
+            return self.transport.post("audio/stop")
+
+        def stop_speaking(self):
+            return self.transport.post("tts/stop")
+
+        def start_face_recognition(self):
+            return self.transport.post("faces/recognition/start")
+
+        def stop_face_recognition(self):
+            return self.transport.post("faces/recognition/stop")
+
+    return PooledRobot
+
+
+_class_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # `from mistyTransport import PooledRobot` works as before; mistyPy is
+    # imported the first time the class is needed rather than with us.
+    if name == "PooledRobot":
+        with _class_lock:
+            if "PooledRobot" not in globals():
+                globals()["PooledRobot"] = _pooled_robot_class()
+        return globals()["PooledRobot"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
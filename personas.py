@@ -0,0 +1,260 @@
+from dataclasses import dataclass, field
+
+# -----------------------------
+# PERSONA DATA OBJECT
+# -----------------------------
+
+@dataclass(frozen=True, eq=False)
+class Persona:
+    """
+    Everything that differs between the experimental conditions.
+    MemoryGame reads all of its behaviour from one of these, so the
+    condition can be swapped between participants without a restart.
+    """
+    name: str
+    title: str                 # shown in the wizard menu header
+    neutral_eyes: list
+    happy_eyes: list
+    idle_led: tuple            # LED color while idle and after a sequence
+    talk_delay: float          # longest wait after the round line (s)
+    round_templates: list
+    dialogue: dict             # dialogue method name -> candidate lines
+    happy: frozenset = frozenset()  # dialogue methods that use happy_eyes
+    pitch: object = None       # Misty TTS pitch, None = robot default
+    menu: dict = field(default_factory=dict)  # wizard command -> label
+
+    def eyes_for(self, key):
+        return self.happy_eyes if key in self.happy else self.neutral_eyes
+
+
+# -----------------------------
+# AUTHORITATIVE
+# -----------------------------
+
+# Authoritative eyes: Neutral, Focused, Unimpressed
+# NO happy eyes in this version.
+AUTHORITATIVE_EYES = [
+    "e_DefaultContent.jpg",
+    "e_Contempt.jpg",     # Slightly stricter/evaluative look
+    "e_SystemBlack.jpg",  # Very robotic/cold look
+]
+
+# Concise, directive phrasing
+AUTHORITATIVE_ROUND_TEMPLATES = [
+    "Initiating round {round}. Difficulty {difficulty}. Observe.",
+    "Round {round}. Difficulty level {difficulty}. Sequence starting.",
+    "Attention. Round {round}, difficulty {difficulty}. Execute observation.",
+]
+
+AUTHORITATIVE_DIALOGUE = {
+    "playerStart": [
+        (
+            "Memory Assessment Protocol initiated. "
+            "I will display a color sequence with the light on my chest. "
+            "It will glow white inbetween each color."
+            "You are required to memorize and after the sequence is done repeat back to me. "
+            "Prepare for the first trial."
+        ),
+    ],
+    "playerWon": [
+        "Sequence verified. All inputs correct. Protocol complete.",
+        "Performance adequate. Task finished. Final result: Success.",
+        "Objective achieved. All sequences replicated.",
+    ],
+    "playerCorrect": [
+        "Correct.",
+        "Sequence matched.",
+        "Input accepted.",
+        "Accurate.",
+    ],
+    "readyForNext": [
+        "Proceeding to next round.",
+        "Loading next sequence.",
+        "Next trial initiating.",
+    ],
+    "playerLost": [
+        "Incorrect sequence.",
+        "Error detected in playback.",
+        "Sequence mismatch. Task failed.",
+        "Input invalid.",
+    ],
+    "playAgainQuestion": [
+        "Shall I proceed with a new game?",
+        "Acknowledge to start new task.",
+        "Should I reset system for a new game?",
+    ],
+    "whatDifficulty": [
+        "Select difficulty level: 1 to 5.",
+        "State desired challenge level, 1 to 5.",
+        "What difficulty level? Choose 1 to 5.",
+    ],
+    "didntHear": [
+        "Input unclear. Repeat.",
+        "Audio not detected. State command again.",
+        "Transmission failed. Repeat.",
+    ],
+    "waterBreak": [
+        "Hydration break initiated. Consume water now to maintain cognitive efficiency.",
+        "Performance check. Hydration required. Drink water immediately.",
+        "Mandatory interval. Water consumption required for optimal function.",
+    ],
+    "acknowledge": [
+        "Acknowledged.",
+        "Noted.",
+        "Input received.",
+        "Ok.",
+    ],
+    "difficultyError": [
+        "Error. Difficulty level not found.",
+    ],
+    "roundError": [
+        "Error. Round index out of bounds.",
+    ],
+    "goodbye": [
+        "Session terminated. Powering down interaction protocol.",
+    ],
+}
+
+AUTHORITATIVE = Persona(
+    name="authoritative",
+    title="AUTHORITATIVE",
+    neutral_eyes=AUTHORITATIVE_EYES,
+    happy_eyes=AUTHORITATIVE_EYES,
+    idle_led=(255, 255, 255),
+    talk_delay=4.5,
+    round_templates=AUTHORITATIVE_ROUND_TEMPLATES,
+    dialogue=AUTHORITATIVE_DIALOGUE,
+    menu={
+        1: "Intro (Protocol Start)",
+        3: "Player correct (Verified)",
+        4: "Player won (Protocol Complete)",
+        5: "Player lost (Error)",
+        6: "Restart question",
+        7: "Ask difficulty",
+        8: "Input unclear",
+        9: "MANDATORY WATER BREAK",
+        11: "Acknowledge (Noted/Proceed)",
+        99: "Terminate Session",
+    },
+)
+
+
+# -----------------------------
+# SUPPORTIVE
+# -----------------------------
+
+SUPPORTIVE_HAPPY_EYES = [
+    "e_Joy.jpg",
+    "e_Joy2.jpg",
+    "e_JoyGoofy.jpg",
+]
+
+SUPPORTIVE_NEUTRAL_EYES = [
+    "e_DefaultContent.jpg",
+]
+
+# Varied supportive phrasing
+SUPPORTIVE_ROUND_TEMPLATES = [
+    "Okay, here comes round {round} on difficulty {difficulty}! Watch closely.",
+    "Get ready for round {round} on difficulty {difficulty}. Try to remember the colors!",
+    "Round {round} on difficulty {difficulty}. I'll show you the sequence now!",
+]
+
+SUPPORTIVE_DIALOGUE = {
+    "playerStart": [
+        (
+            "Hi! My name is Misty. We're going to play a memory game together. "
+            "I will show you a sequence of colors with the light on my chest. "
+            "Your job is to remember the order and repeat it back to me. "
+            "My chest will glow white inbetween each color. "
+            "Don't worry! We'll take it step by step!"
+            "Are you ready to start?"
+        ),
+    ],
+    "playerWon": [
+        "Wow, you did it! You completed the whole sequence. I'm really impressed!",
+        "Amazing work! You got the entire sequence right!",
+        "You nailed it! That was perfect memory work!",
+    ],
+    "playerCorrect": [
+        "Nice job! That's the correct sequence!",
+        "Yes, exactly right! You're doing really well.",
+        "Correct! You remembered that perfectly!",
+    ],
+    "readyForNext": [
+        "Ready for the next round? You're doing great!",
+        "Shall we try the next round? I believe in you!",
+        "If you're ready, we can continue to the next round!",
+    ],
+    "playerLost": [
+        "That sequence was tricky, but that's okay! We can try again.",
+        "No worries, that one was tough. Want to give it another go?",
+        "It didn’t work this time, but I know you can get it next round!",
+    ],
+    "playAgainQuestion": [
+        "Would you like to play again?",
+        "Do you want to try another round?",
+        "Would you like to go again?",
+    ],
+    "whatDifficulty": [
+        "Which difficulty would you like? One to five!",
+        "Pick a difficulty between one and five!",
+        "Tell me a difficulty: one is easiest, five is hardest!",
+    ],
+    "didntHear": [
+        "Sorry, I didn't quite hear that. Could you repeat it?",
+        "I think I missed that. Can you say it again?",
+        "Oops, I didn't catch that. Could you repeat yourself?",
+    ],
+    "waterBreak": [
+        "Hey, how about we take a little sip of water?",
+        "Quick pause! This could be a good moment to have a drink of water.",
+        "Before we continue, maybe take a small sip of water. It can help you stay focused!",
+    ],
+    "acknowledge": [
+        "Cool!",
+        "Great!",
+        "Awesome!",
+        "Nice!",
+    ],
+    "difficultyError": [
+        "Oops, I don't have that difficulty set up yet.",
+    ],
+    "roundError": [
+        "Hmm, that round doesn't exist for this difficulty.",
+    ],
+    "goodbye": [
+        "Okay! It was really fun playing with you. Have a wonderful rest of your day. Goodbye!",
+    ],
+}
+
+SUPPORTIVE = Persona(
+    name="supportive",
+    title="Supportive",
+    neutral_eyes=SUPPORTIVE_NEUTRAL_EYES,
+    happy_eyes=SUPPORTIVE_HAPPY_EYES,
+    idle_led=(255, 255, 255),
+    talk_delay=6,
+    round_templates=SUPPORTIVE_ROUND_TEMPLATES,
+    dialogue=SUPPORTIVE_DIALOGUE,
+    happy=frozenset({"doRound", "playerWon", "playerCorrect", "acknowledge"}),
+    menu={
+        1: "Intro",
+        3: "Player correct",
+        4: "Player won",
+        5: "Player lost",
+        6: "Play again question",
+        7: "Ask difficulty",
+        8: "Didn't hear",
+        9: "Suggest water break",
+        11: "Simple acknowledgement (Cool / Great / Awesome)",
+        99: "Say goodbye",
+    },
+)
+
+
+# Wizard command "10 <n>" switches to PERSONAS[n]
+PERSONAS = {
+    1: AUTHORITATIVE,
+    2: SUPPORTIVE,
+}
@@ -0,0 +1,267 @@
+"""
+Startup check of one robot: assets, battery, volume and latency.
+
+    python preflight.py 192.168.1.237
+    python preflight.py 127.0.0.1:8080 --budget 3 --no-upload
+
+Runs automatically when the wizard and test.py start; the wizard holds
+game commands until the report is in. Every check runs at the same time
+and the report is printed after PREFLIGHT_BUDGET seconds at the latest,
+so a slow or missing robot can't hold up the session; checks that didn't
+finish by then are reported as such.
+
+Images: every eye image the personas, the greeting skill, test.py and the
+PilotCode intros reference is compared with the robot's image list.
+Missing ones found in ASSET_DIR are uploaded; the rest are reported.
+Audio: speech cache clips the robot doesn't have are uploaded (speechCache).
+Uploads stop at the budget too; what is left goes up at the next start.
+"""
+import argparse
+import base64
+import glob
+import os
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+HERE = os.path.dirname(os.path.abspath(__file__))
+PREFLIGHT_BUDGET = 5.0   # s until the report is printed, finished or not
+ASSET_DIR = os.path.join(HERE, "assets")  # images to upload when missing
+# Scripts scanned for hard-coded image names (personas and the greeting
+# reactions are read directly)
+ASSET_SOURCES = ["test.py", "greetingSkill.py", "PilotCode/*.py"]
+IMAGE_NAME = re.compile(r"[\"']([\w.-]+\.(?:jpg|jpeg|png|gif))[\"']", re.IGNORECASE)
+MIN_BATTERY = 30         # % below which a session shouldn't start
+MIN_VOLUME = 30          # % below which participants may not hear Misty
+MAX_RTT = 0.15           # s median round trip before we warn
+RTT_PROBES = 5
+
+OK, WARN, FAIL = "OK", "WARN", "FAIL"
+
+
+# --------------------------------------
+# WHAT THE SCRIPTS NEED
+# --------------------------------------
+
+def referenced_images():
+    """Every image name the scripts can display."""
+    from greetingSkill import REACTIONS
+    from personas import PERSONAS
+
+    names = set()
+    for persona in PERSONAS.values():
+        names.update(persona.neutral_eyes)
+        names.update(persona.happy_eyes)
+    names.update(reaction.image for reaction in REACTIONS.values())
+    for pattern in ASSET_SOURCES:
+        for path in glob.glob(os.path.join(HERE, pattern)):
+            with open(path, encoding="utf-8") as f:
+                names.update(IMAGE_NAME.findall(f.read()))
+    return names
+
+
+# --------------------------------------
+# ROBOT ASSET LISTS
+# --------------------------------------
+
+_asset_lists = {}  # (robot ip, "images" | "audio") -> set of names
+_asset_lists_lock = threading.Lock()
+
+
+def robot_assets(transport, kind, timeout=None, refresh=False):
+    """
+    Names of the images or audio files on the robot. Fetched once per
+    robot and cached; uploads through this module keep the cache current.
+    """
+    key = (transport.robot_ip, kind)
+    with _asset_lists_lock:
+        names = _asset_lists.get(key)
+    if names is not None and not refresh:
+        return names
+    response = transport.get(f"{kind}/list", timeout=timeout)
+    names = {
+        item.get("name") or item.get("Name")
+        for item in response.json().get("result") or []
+    }
+    with _asset_lists_lock:
+        _asset_lists[key] = names
+    return names
+
+
+def remember_assets(transport, kind, names):
+    """Use a list fetched elsewhere (e.g. SpeechCache.on_robot); uploads add to it."""
+    with _asset_lists_lock:
+        _asset_lists[(transport.robot_ip, kind)] = names
+
+
+def _call_timeout(deadline):
+    """Per-request timeout that ends with the budget."""
+    return max(0.1, deadline - time.monotonic())
+
+
+# --------------------------------------
+# CHECKS
+# --------------------------------------
+# Each check takes (transport, deadline, upload) and returns (status, message).
+
+def check_images(transport, deadline, upload):
+    needed = referenced_images()
+    on_robot = robot_assets(transport, "images", _call_timeout(deadline))
+    missing = sorted(needed - on_robot)
+    uploaded = []
+    if upload:
+        for name in missing:
+            path = os.path.join(ASSET_DIR, name)
+            if not os.path.exists(path):
+                continue
+            if time.monotonic() >= deadline:
+                break  # out of budget: reported as missing
+            with open(path, "rb") as f:
+                data = base64.b64encode(f.read()).decode("ascii")
+            try:
+                transport.post("images", {
+                    "FileName": name, "Data": data,
+                    "ImmediatelyApply": False, "OverwriteExisting": True,
+                }, timeout=_call_timeout(deadline))
+            except Exception:
+                if time.monotonic() < deadline:
+                    raise
+                break  # cut off by the budget: reported as missing
+            on_robot.add(name)
+            uploaded.append(name)
+    missing = [name for name in missing if name not in uploaded]
+    text = f"{len(needed)} referenced"
+    if uploaded:
+        text += f", uploaded {len(uploaded)} ({', '.join(uploaded)})"
+    if missing:
+        return FAIL, text + f", MISSING {', '.join(missing)}"
+    return OK, text + ", all on robot"
+
+
+def check_audio(transport, deadline, upload):
+    from speechCache import cached_clips
+    from speechCache import upload as upload_clips
+
+    clips = cached_clips()
+    on_robot = robot_assets(transport, "audio", _call_timeout(deadline))
+    if not clips:
+        return OK, f"no speech cache built, {len(on_robot)} files on robot"
+    missing = clips - on_robot
+    if missing and upload:
+        upload_clips(transport, on_robot=on_robot, deadline=deadline)
+        left = len(clips - on_robot)
+        if left:
+            return WARN, (f"{len(clips)} speech clips, uploaded {len(missing) - left}, "
+                          f"{left} left for the next start (live TTS instead)")
+        return OK, f"{len(clips)} speech clips, uploaded {len(missing)}"
+    if missing:
+        return WARN, f"{len(missing)} of {len(clips)} speech clips missing (live TTS instead)"
+    return OK, f"{len(clips)} speech clips, all on robot"
+
+
+def check_battery(transport, deadline, upload):
+    result = transport.get("battery", timeout=_call_timeout(deadline)).json().get("result") or {}
+    charge = result.get("chargePercent")
+    if charge is None:
+        return WARN, "charge unknown"
+    percent = charge * 100 if charge <= 1 else charge
+    text = f"{percent:.0f}%{' (charging)' if result.get('isCharging') else ''}"
+    return (WARN if percent < MIN_BATTERY else OK), text
+
+
+def check_volume(transport, deadline, upload):
+    result = transport.get("device", timeout=_call_timeout(deadline)).json().get("result") or {}
+    volume = result.get("volume") if isinstance(result, dict) else None
+    if volume is None:
+        return WARN, "volume unknown, check it by ear"
+    return (WARN if volume < MIN_VOLUME else OK), f"{volume}"
+
+
+def check_latency(transport, deadline, upload):
+    rtts = []
+    for _ in range(RTT_PROBES):
+        sent = time.monotonic()
+        try:
+            transport.get("battery", timeout=_call_timeout(deadline))
+        except Exception:
+            if not rtts:
+                raise
+            break  # out of budget: report the probes we have
+        rtts.append(time.monotonic() - sent)
+    median = statistics.median(rtts)
+    text = f"round trip median {median * 1000:.0f} ms, max {max(rtts) * 1000:.0f} ms"
+    return (WARN if median > MAX_RTT else OK), text
+
+
+CHECKS = {
+    "images": check_images,
+    "audio": check_audio,
+    "battery": check_battery,
+    "volume": check_volume,
+    "latency": check_latency,
+}
+
+
+# --------------------------------------
+# RUNNING THE PREFLIGHT
+# --------------------------------------
+
+def preflight(transport, budget=PREFLIGHT_BUDGET, upload=True):
+    """
+    Run every check at once; returns [(check, status, message)] after
+    `budget` seconds at the latest. Every request a check sends ends with
+    the budget, uploads included.
+    """
+    started = time.monotonic()
+    deadline = started + budget
+    executor = ThreadPoolExecutor(max_workers=len(CHECKS), thread_name_prefix="preflight")
+    futures = {name: executor.submit(check, transport, deadline, upload)
+               for name, check in CHECKS.items()}
+    wait(futures.values(), timeout=budget)
+    executor.shutdown(wait=False)
+
+    results = []
+    for name, future in futures.items():
+        if not future.done():
+            results.append((name, FAIL, f"no answer within {budget:.0f} s"))
+            continue
+        try:
+            status, text = future.result()
+        except Exception as e:
+            status, text = FAIL, f"{type(e).__name__}: {e}"
+        results.append((name, status, text))
+    print_report(results, time.monotonic() - started, budget)
+    return results
+
+
+def print_report(results, elapsed, budget):
+    print(f"Preflight ({elapsed:.1f} s of {budget:.0f} s budget)")
+    for name, status, text in results:
+        print(f"  {name:<9}{status:<6}{text}")
+    if any(status == FAIL for _, status, _ in results):
+        print("  Fix the FAIL items before the participant arrives.")
+
+
+def ready(results):
+    return all(status != FAIL for _, status, _ in results)
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    from mistyTransport import get_transport
+
+    parser = argparse.ArgumentParser(description="Check a robot before a session")
+    parser.add_argument("robot", nargs="?", default=os.environ.get("MISTY_IP", "192.168.1.237"))
+    parser.add_argument("--budget", type=float, default=PREFLIGHT_BUDGET, help="s for all checks")
+    parser.add_argument("--no-upload", action="store_true", help="only report missing assets")
+    args = parser.parse_args()
+    results = preflight(get_transport(args.robot), args.budget, not args.no_upload)
+    raise SystemExit(0 if ready(results) else 1)
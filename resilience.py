@@ -0,0 +1,208 @@
+"""
+Deadlines, retries and a circuit breaker for robot calls.
+
+Every MistyTransport.request() goes through call() below:
+
+  * Deadline: all attempts of one call together take at most
+    DEADLINES[endpoint] (default CALL_DEADLINE) seconds; each attempt's
+    timeout is cut to what is left.
+  * Retries: reads and commands that can safely run twice (LED, eyes,
+    arms, head, uploads, ...) are retried with jittered exponential
+    backoff. Speech, audio playback and skill starts are only retried when
+    the connection was never opened, so Misty can't say a line twice.
+  * Circuit breaker: after FAILURE_THRESHOLD failed calls in a row the
+    robot is marked offline, an OFFLINE banner is printed and every call
+    fails at once with RobotOffline instead of hanging. A background probe
+    retries the robot every PROBE_INTERVAL seconds and closes the breaker
+    (and prints that the robot is back) as soon as it answers.
+
+Only network failures (no connection, timeouts) count, once per call.
+A timeout under the endpoint's own deadline counts like any other; only
+one cut short by a budget the caller passed in doesn't, since that says
+more about the caller than about the robot. An HTTP error means Misty
+answered, so it is raised as before and the robot counts as online.
+"""
+import random
+import threading
+import time
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+CALL_DEADLINE = 8.0       # s for all attempts of one call
+DEADLINES = {
+    "led": 1.5,           # a late LED edge is useless to the sequence anyway
+    "images/display": 3.0,
+    "images": 30.0,       # uploads
+    "audio": 30.0,
+}
+RETRIES = 2               # extra attempts after the first one
+BACKOFF_BASE = 0.1        # s, doubled per attempt ...
+BACKOFF_MAX = 1.0         # ... up to this; the actual wait is random below it
+NOT_IDEMPOTENT = {"tts/speak", "audio/play", "skills/start"}  # POSTs that act twice if repeated
+FAILURE_THRESHOLD = 3     # failed calls in a row before the robot counts as offline
+PROBE_ENDPOINT = "battery"
+PROBE_INTERVAL = 2.0      # s between reconnect probes while offline
+PROBE_TIMEOUT = 1.5       # s per probe
+
+
+class RobotOffline(ConnectionError):
+    """The circuit breaker is open; the call was not sent."""
+
+
+# --------------------------------------
+# CIRCUIT BREAKER
+# --------------------------------------
+
+class CircuitBreaker:
+    """
+    Counts failed calls against one robot. Once open, `online` is False
+    until probe() succeeds on the background reconnect thread.
+    on_change(online, seconds offline) is called on every transition.
+    """
+
+    def __init__(self, name, probe, threshold=FAILURE_THRESHOLD,
+                 probe_interval=PROBE_INTERVAL, on_change=None):
+        self.name = name
+        self.probe = probe
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.on_change = on_change
+        self.failures = 0
+        self.opened_at = None  # monotonic time the robot went offline
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    @property
+    def online(self):
+        return self.opened_at is None
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures < self.threshold:
+                return
+            self.opened_at = time.monotonic()
+            self.trips += 1
+        _offline.add(self.name)
+        self._changed(False, 0.0)
+        threading.Thread(target=self._reconnect, name=f"reconnect-{self.name}",
+                         daemon=True).start()
+
+    def _reconnect(self):
+        while True:
+            time.sleep(self.probe_interval)
+            try:
+                self.probe()
+            except Exception:
+                continue
+            with self._lock:
+                down_for = time.monotonic() - self.opened_at
+                self.opened_at = None
+                self.failures = 0
+            _offline.discard(self.name)
+            self._changed(True, down_for)
+            return
+
+    def _changed(self, online, down_for):
+        if self.on_change is not None:
+            self.on_change(online, down_for)
+        else:
+            announce(self.name, online, down_for)
+
+
+_offline = set()  # names of robots whose breaker is open
+
+
+def offline_robots():
+    """Robots currently marked offline, for status lines."""
+    return sorted(_offline)
+
+
+def offline_banner(name):
+    return f"*** ROBOT {name} OFFLINE: commands are skipped until it answers again ***"
+
+
+def announce(name, online, down_for):
+    """Tell the operator; printed from whichever thread noticed."""
+    if online:
+        print(f"\n*** Robot {name} is back online (offline {down_for:.1f} s) ***")
+    else:
+        print("\n" + offline_banner(name))
+
+
+# --------------------------------------
+# ONE CALL
+# --------------------------------------
+
+def _network_errors():
+    from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+
+    return (ConnectionError, Timeout), ConnectTimeout, Timeout
+
+
+def may_retry(method, endpoint, error, not_sent):
+    """Retrying is safe if the request never reached Misty or repeating it is harmless."""
+    if isinstance(error, not_sent):
+        return True
+    return method != "POST" or endpoint not in NOT_IDEMPOTENT
+
+
+def backoff(attempt):
+    """Full jitter: a random wait below the exponential bound."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def call(send, method, endpoint, timeout, breaker, deadline=None, retries=RETRIES):
+    """
+    send(timeout) does one attempt. Returns its result, or raises
+    RobotOffline (breaker open) or the last network error. deadline
+    defaults to DEADLINES for the endpoint; a deadline passed in is the
+    caller's budget, so running out of it isn't held against the robot.
+    """
+    if not breaker.online:
+        raise RobotOffline(f"Robot {breaker.name} is offline, {method} {endpoint} not sent")
+    network_errors, not_sent, timed_out = _network_errors()
+
+    budgeted = deadline is not None
+    if deadline is None:
+        deadline = DEADLINES.get(endpoint, CALL_DEADLINE)
+    ends = time.monotonic() + deadline
+
+    attempt = 0
+    robot_failed = False  # an attempt failed that the caller's budget didn't cut short
+    while True:
+        try:
+            result = send(_clip(timeout, ends - time.monotonic()))
+        except network_errors as e:
+            if not (budgeted and isinstance(e, timed_out)):
+                robot_failed = True
+            wait = backoff(attempt)
+            if (attempt < retries and breaker.online
+                    and may_retry(method, endpoint, e, not_sent)
+                    and time.monotonic() + wait < ends):
+                attempt += 1
+                time.sleep(wait)
+                continue
+            if robot_failed:
+                breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
+
+def longest(timeout):
+    """Worst case of one attempt, for callers that pass their own timeout."""
+    return sum(timeout) if isinstance(timeout, tuple) else timeout
+
+
+def _clip(timeout, left):
+    """The transport's (connect, read) timeout cut to the time left."""
+    left = max(0.05, left)
+    if isinstance(timeout, tuple):
+        return tuple(min(part, left) for part in timeout)
+    return min(timeout, left)
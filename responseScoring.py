@@ -0,0 +1,114 @@
+"""
+Scores a participant's answer against the sequence Misty just showed.
+
+The wizard types the answer as color initials ("gbby", "g b b y" or
+full names); score() compares it to the sequence exactly and by edit
+distance, and lists every position that went wrong.
+
+    >>> score(["green", "blue", "blue"], parse_answer("gbg", COLORS))
+    Score(correct=False, distance=1, errors=[(2, 'substituted', 'blue', 'green')])
+"""
+from collections import namedtuple
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+COLORS = ("green", "blue", "red", "yellow", "purple", "cyan", "white")
+MAX_DISTANCE = 0  # edits an answer may have and still count as correct
+
+Score = namedtuple("Score", "correct distance errors")
+# errors: (position, kind, expected color or None, given color or None), with
+# kind "substituted", "missed" (left out) or "added" (extra color given);
+# position is 0-based in the shown sequence.
+
+
+# --------------------------------------
+# PARSING
+# --------------------------------------
+
+def initials(colors=COLORS):
+    """{initial: color}; every color needs its own first letter."""
+    table = {}
+    for color in colors:
+        if color[0] in table:
+            raise ValueError(f"{color} and {table[color[0]]} share the initial {color[0]!r}")
+        table[color[0]] = color
+    return table
+
+
+def parse_answer(text, colors=COLORS):
+    """
+    "gbby", "g b b y", "g,b,b,y" or "green blue blue yellow" -> list of
+    color names. Raises ValueError on anything that isn't a color.
+    """
+    names = set(colors)
+    letters = initials(colors)
+    words = text.lower().replace(",", " ").split()
+    if words and all(word in names for word in words):
+        return words
+
+    answer = []
+    for letter in "".join(words):
+        if letter not in letters:
+            raise ValueError(f"{letter!r} is not a color initial "
+                             f"({', '.join(f'{k} = {v}' for k, v in letters.items())})")
+        answer.append(letters[letter])
+    return answer
+
+
+# --------------------------------------
+# SCORING
+# --------------------------------------
+
+def score(expected, answer, max_distance=MAX_DISTANCE):
+    """Levenshtein distance between the sequences, plus where it went wrong."""
+    expected, answer = list(expected), list(answer)
+    rows, columns = len(expected) + 1, len(answer) + 1
+    cost = [[0] * columns for _ in range(rows)]
+    for i in range(rows):
+        cost[i][0] = i
+    for j in range(columns):
+        cost[0][j] = j
+    for i in range(1, rows):
+        for j in range(1, columns):
+            cost[i][j] = min(
+                cost[i - 1][j] + 1,        # missed
+                cost[i][j - 1] + 1,        # added
+                cost[i - 1][j - 1] + (expected[i - 1] != answer[j - 1]),
+            )
+
+    # Walk back through the table for the cheapest set of edits
+    errors = []
+    i, j = len(expected), len(answer)
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and cost[i][j] == cost[i - 1][j - 1] + (expected[i - 1] != answer[j - 1]):
+            if expected[i - 1] != answer[j - 1]:
+                errors.append((i - 1, "substituted", expected[i - 1], answer[j - 1]))
+            i, j = i - 1, j - 1
+        elif i > 0 and cost[i][j] == cost[i - 1][j] + 1:
+            errors.append((i - 1, "missed", expected[i - 1], None))
+            i -= 1
+        else:
+            errors.append((i, "added", None, answer[j - 1]))
+            j -= 1
+    errors.reverse()
+
+    distance = cost[-1][-1]
+    return Score(distance <= max_distance, distance, errors)
+
+
+def describe(result):
+    """One line for the wizard, e.g. 'wrong, 1 edit: position 3 blue -> green'."""
+    if result.distance == 0:
+        return "correct"
+    verdict = "correct" if result.correct else "wrong"
+    details = []
+    for position, kind, expected, given in result.errors:
+        if kind == "substituted":
+            details.append(f"position {position + 1} {expected} -> {given}")
+        elif kind == "missed":
+            details.append(f"position {position + 1} {expected} missed")
+        else:
+            details.append(f"{given} added before position {position + 1}")
+    edits = "edit" if result.distance == 1 else "edits"
+    return f"{verdict}, {result.distance} {edits}: " + "; ".join(details)
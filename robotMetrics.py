@@ -0,0 +1,204 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+METRICS_PORT = int(os.environ.get("MISTY_METRICS_PORT", "9100"))
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+RECENT_SAMPLES = 1000  # per endpoint, for the percentiles in the exit summary
+
+
+# --------------------------------------
+# PER-ENDPOINT STATISTICS
+# --------------------------------------
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds, ok):
+        self.count += 1
+        self.total += seconds
+        if not ok:
+            self.errors += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+        self.recent.append(seconds)
+
+    def percentile(self, p):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+
+
+class RobotMetrics:
+    """
+    Latency histogram, error count and in-flight count per
+    (robot, endpoint), plus free-form gauges other parts can publish.
+    """
+
+    def __init__(self):
+        self.stats = {}   # (robot, endpoint) -> EndpointStats
+        self.gauges = {}  # (name, robot) -> (value, help)
+        self._lock = threading.Lock()
+
+    def _stats(self, robot, endpoint):
+        key = (robot, endpoint)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = EndpointStats()
+        return stats
+
+    @contextmanager
+    def track(self, robot, endpoint):
+        """Time one call; exceptions count as errors and are re-raised."""
+        with self._lock:
+            self._stats(robot, endpoint).in_flight += 1
+        start = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                stats = self._stats(robot, endpoint)
+                stats.in_flight -= 1
+                stats.observe(elapsed, ok)
+
+    def set_gauge(self, name, value, robot="", help_text=""):
+        with self._lock:
+            self.gauges[(name, robot)] = (value, help_text)
+
+    # ------------- OUTPUT -------------
+
+    def render(self):
+        """Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            items = sorted(self.stats.items())
+            gauges = sorted(self.gauges.items())
+
+        lines.append("# HELP misty_request_seconds Robot REST call latency.")
+        lines.append("# TYPE misty_request_seconds histogram")
+        for (robot, endpoint), stats in items:
+            labels = f'robot="{robot}",endpoint="{endpoint}"'
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                lines.append(f'misty_request_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'misty_request_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"misty_request_seconds_sum{{{labels}}} {stats.total:.6f}")
+            lines.append(f"misty_request_seconds_count{{{labels}}} {stats.count}")
+
+        lines.append("# HELP misty_request_errors_total Robot REST calls that failed.")
+        lines.append("# TYPE misty_request_errors_total counter")
+        for (robot, endpoint), stats in items:
+            lines.append(f'misty_request_errors_total{{robot="{robot}",endpoint="{endpoint}"}} {stats.errors}')
+
+        lines.append("# HELP misty_requests_in_flight Robot REST calls waiting for a reply.")
+        lines.append("# TYPE misty_requests_in_flight gauge")
+        for (robot, endpoint), stats in items:
+            lines.append(f'misty_requests_in_flight{{robot="{robot}",endpoint="{endpoint}"}} {stats.in_flight}')
+
+        seen = set()
+        for (name, robot), (value, help_text) in gauges:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {help_text or name}")
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f'{name}{{robot="{robot}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Human readable table, printed when a script exits."""
+        with self._lock:
+            items = sorted(self.stats.items())
+        if not items:
+            return "No robot calls recorded."
+        rows = [f"{'robot':<22}{'endpoint':<26}{'calls':>7}{'errors':>8}"
+                f"{'mean ms':>9}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}"]
+        for (robot, endpoint), stats in items:
+            mean = stats.total / stats.count if stats.count else 0.0
+            rows.append(
+                f"{robot:<22}{endpoint:<26}{stats.count:>7}{stats.errors:>8}"
+                f"{mean * 1000:>9.0f}{stats.percentile(50) * 1000:>8.0f}"
+                f"{stats.percentile(95) * 1000:>8.0f}"
+                f"{max(stats.recent, default=0) * 1000:>8.0f}"
+            )
+        return "\n".join(rows)
+
+
+# Process-wide registry shared by every instrumented robot
+METRICS = RobotMetrics()
+
+
+# --------------------------------------
+# HOOKING UP ROBOTS
+# --------------------------------------
+
+def instrument(misty, metrics=METRICS):
+    """
+    Record every REST call the robot makes. All commands (including LED
+    skills and audio uploads) go through its MistyTransport, so that is
+    where the timing happens; the robot object itself is unchanged.
+    """
+    misty.transport.metrics = metrics
+    return misty
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = METRICS
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = self.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+_server = None
+
+
+def serve_metrics(port=METRICS_PORT, metrics=METRICS):
+    """Expose http://localhost:<port>/metrics in a background thread."""
+    global _server
+    if _server is not None:
+        return _server
+
+    class Handler(_MetricsHandler):
+        pass
+    Handler.metrics = metrics
+
+    try:
+        _server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    except OSError as e:
+        print(f"Metrics endpoint not started on port {port}:", e)
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    print(f"Robot metrics on http://127.0.0.1:{_server.server_address[1]}/metrics")
+    return _server
+
+
+def print_summary_at_exit(metrics=METRICS):
+    atexit.register(lambda: print("\n" + metrics.summary()))
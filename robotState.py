@@ -0,0 +1,124 @@
+import threading
+from collections import Counter
+
+
+# --------------------------------------
+# SHADOW MODEL OF MISTY'S OUTPUTS
+# --------------------------------------
+
+class ShadowRobot:
+    """
+    Wraps a Robot and remembers what it currently shows: LED color,
+    displayed image per layer, arm and head positions.
+
+    Output commands that would not change any of that are dropped and
+    counted instead of being sent. Everything else is passed through to
+    the wrapped robot unchanged.
+    """
+
+    def __init__(self, robot):
+        self.robot = robot
+        self.state = {}
+        self.sent = Counter()
+        self.saved = Counter()
+        self._lock = threading.Lock()
+        # After the robot was offline (maybe rebooted) nothing we remember holds
+        transport = getattr(robot, "transport", None)
+        if hasattr(transport, "on_reconnect"):
+            transport.on_reconnect(self.forget)
+
+    def __getattr__(self, name):
+        return getattr(self.robot, name)
+
+    def _apply(self, command, changes, send):
+        """changes: {state key: new value}; send is only called if one differs."""
+        with self._lock:
+            if all(key in self.state and self.state[key] == value
+                   for key, value in changes.items()):
+                self.saved[command] += 1
+                return None
+        result = send()
+        with self._lock:
+            self.state.update(changes)
+            self.sent[command] += 1
+        return result
+
+    # ------------- TRACKED OUTPUTS -------------
+
+    def change_led(self, red=None, green=None, blue=None):
+        return self._apply(
+            "change_led", {"led": (red, green, blue)},
+            lambda: self.robot.change_led(red, green, blue),
+        )
+
+    def display_image(self, fileName=None, alpha=None, layer=None, isURL=None):
+        return self._apply(
+            "display_image", {("image", layer): (fileName, alpha, isURL)},
+            lambda: self.robot.display_image(fileName, alpha, layer, isURL),
+        )
+
+    def move_arm(self, arm=None, position=None, velocity=None, units=None, duration=None):
+        # Velocity/duration only change how we get there, not where we end up
+        arms = ["left", "right"] if str(arm).lower() == "both" else [str(arm).lower()]
+        return self._apply(
+            "move_arm", {("arm", name): (position, units) for name in arms},
+            lambda: self.robot.move_arm(arm, position, velocity, units, duration),
+        )
+
+    def move_head(self, pitch=None, roll=None, yaw=None, velocity=None,
+                  units=None, duration=None):
+        if None in (pitch, roll, yaw):
+            # Partial moves leave the other axes where they are; we can't
+            # predict the result, so send it and stop trusting the model.
+            self.forget("head")
+            with self._lock:
+                self.sent["move_head"] += 1
+            return self.robot.move_head(pitch, roll, yaw, velocity, units, duration)
+        return self._apply(
+            "move_head", {"head": (pitch, roll, yaw, units)},
+            lambda: self.robot.move_head(pitch, roll, yaw, velocity, units, duration),
+        )
+
+    # ------------- OUTSIDE CHANGES -------------
+
+    def record(self, key, value):
+        """Note an output that was changed without going through this wrapper."""
+        with self._lock:
+            self.state[key] = value
+
+    def forget(self, *keys):
+        """
+        Stop assuming anything about these outputs, or about any output
+        without keys (the next command is sent).
+        """
+        with self._lock:
+            if not keys:
+                self.state.clear()
+            for key in keys:
+                self.state.pop(key, None)
+
+    def report(self):
+        sent = sum(self.sent.values())
+        saved = sum(self.saved.values())
+        details = ", ".join(f"{name} {count}" for name, count in self.saved.most_common())
+        return (
+            f"Output commands: {sent} sent, {saved} redundant ones dropped"
+            + (f" ({details})" if details else "")
+        )
+
+
+def raw_robot(misty):
+    """The robot underneath a ShadowRobot (or misty itself)."""
+    return misty.robot if isinstance(misty, ShadowRobot) else misty
+
+
+def note_output(misty, key, value=None):
+    """
+    Tell the shadow model (if any) about an output that changed behind its
+    back, e.g. an on-robot LED program. value=None means "unknown".
+    """
+    if isinstance(misty, ShadowRobot):
+        if value is None:
+            misty.forget(key)
+        else:
+            misty.record(key, value)
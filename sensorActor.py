@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+import traceback
+
+from robotMetrics import METRICS
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+ACTOR_QUEUE_SIZE = 64  # events waiting to be handled; newer ones are dropped
+
+
+# --------------------------------------
+# SENSOR EVENT ACTOR
+# --------------------------------------
+
+class SensorActor:
+    """
+    Runs every sensor callback on one thread, in arrival order.
+
+    Misty's websocket threads only put events in a bounded queue, so
+    handlers never race each other over shared state and a slow handler
+    can't stall the websocket. Coalesced event streams (ToF) keep at most
+    one entry in the queue: if readings pile up behind a slow action, only
+    the newest one is handled.
+
+    Handlers are called as handler(data, received), where received is the
+    time.time() at which the event arrived (not when it is handled).
+    """
+
+    def __init__(self, robot="", maxsize=ACTOR_QUEUE_SIZE, metrics=METRICS):
+        self.robot = robot
+        self.metrics = metrics
+        self.queue = queue.Queue(maxsize)
+        self.latest = {}  # coalesce key -> (handler, data, received)
+        self.dropped = 0
+        self.coalesced = 0
+        self.processed = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="sensor-actor", daemon=True)
+        self._thread.start()
+
+    def callback(self, handler, coalesce=None):
+        """
+        Wrap handler as a mistyPy callback_function that goes through the actor.
+        coalesce: function(data) -> stream key (e.g. the ToF sensor); only the
+                  newest queued event per key is handled.
+        """
+        def enqueue(data):
+            key = None if coalesce is None else (handler, coalesce(data))
+            self.submit(handler, data, key)
+        return enqueue
+
+    def submit(self, handler, data, key=None):
+        """Queue one event; safe to call from any thread."""
+        received = time.time()
+        if key is None:
+            try:
+                self.queue.put_nowait((None, (handler, data, received)))
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                self._publish()
+            return
+
+        # A key is in self.latest exactly while a queue slot for it exists;
+        # the put happens under the lock so no other submit sees a slot
+        # that turns out to be missing.
+        with self._lock:
+            if key in self.latest:
+                # An older reading is still queued; it is replaced
+                self.latest[key] = (handler, data, received)
+                self.coalesced += 1
+                return
+            try:
+                self.queue.put_nowait((key, None))  # handled with whatever is newest by then
+            except queue.Full:
+                self.dropped += 1
+            else:
+                self.latest[key] = (handler, data, received)
+                return
+        self._publish()
+
+    def _next(self):
+        key, event = self.queue.get()
+        if key is None:
+            return event
+        with self._lock:
+            return self.latest.pop(key, None)
+
+    def _run(self):
+        while True:
+            event = self._next()
+            if event is None:
+                continue
+            handler, data, received = event
+            try:
+                handler(data, received)
+            except Exception:
+                print(f"Sensor handler {handler.__name__} failed:")
+                traceback.print_exc()
+            with self._lock:
+                self.processed += 1
+            self._publish()
+
+    def _publish(self):
+        self.metrics.set_gauge("misty_sensor_queue_depth", self.queue.qsize(), self.robot,
+                               "Sensor events waiting for the actor.")
+        self.metrics.set_gauge("misty_sensor_events_processed", self.processed, self.robot,
+                               "Sensor events handled by the actor.")
+        self.metrics.set_gauge("misty_sensor_events_dropped", self.dropped, self.robot,
+                               "Sensor events dropped because the actor queue was full.")
+        self.metrics.set_gauge("misty_sensor_events_coalesced", self.coalesced, self.robot,
+                               "Stale sensor readings replaced by a newer one.")
+
+    def report(self):
+        return (
+            f"Sensor events: {self.processed} handled, {self.coalesced} stale readings "
+            f"coalesced, {self.dropped} dropped (queue full)"
+        )
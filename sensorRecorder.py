@@ -0,0 +1,275 @@
+"""
+Record sensor events from a live session and replay them offline.
+
+    python test.py --record sessions/visit1.msr      # record while running
+    python sensorRecorder.py info sessions/visit1.msr
+    python sensorRecorder.py replay sessions/visit1.msr --speed 0
+    python sensorRecorder.py replay sessions/visit1.msr --save before.json
+    python sensorRecorder.py replay sessions/visit1.msr --compare before.json
+
+Replay feeds the recorded events straight into a GreetingSkill's
+handlers, with each event's recorded time as `now`, and a RecordingSink
+in place of the robot. --speed 1 replays in real time, --speed 0 as fast
+as possible. Either way the behavior decisions are the same, so a saved replay is a
+regression test for changes to the thresholds or the behavior logic.
+"""
+import argparse
+import json
+import struct
+import sys
+import threading
+import time
+
+from mistyPy.Events import Events
+
+# --------------------------------------
+# FILE FORMAT
+# --------------------------------------
+# "MSR1", then one record per event:
+#   <dBH  time.time() received, event kind, payload length
+#   payload (see _encode)
+MAGIC = b"MSR1"
+RECORD = struct.Struct("<dBH")
+TOF = struct.Struct("<Bf")      # sensor, distance m
+FACE = struct.Struct("<f")      # confidence, then the UTF-8 label
+TOUCH = struct.Struct("<BB")    # sensor, contacted
+
+KIND_OTHER, KIND_TOF, KIND_FACE, KIND_TOUCH = 0, 1, 2, 3
+EVENT_TYPES = {
+    KIND_TOF: Events.TimeOfFlight,
+    KIND_FACE: Events.FaceRecognition,
+    KIND_TOUCH: Events.TouchSensor,
+}
+TOF_SENSORS = ["Center", "Left", "Right", "Back",
+               "DownFrontRight", "DownFrontLeft", "DownBackRight", "DownBackLeft"]
+TOUCH_SENSORS = ["HeadFront", "HeadBack", "HeadLeft", "HeadRight", "Scruff",
+                 "Chin", "ChinLeft", "ChinRight", "BumpFrontRight", "BumpFrontLeft",
+                 "BumpRearRight", "BumpRearLeft"]
+FLUSH_EVERY = 50  # records
+
+
+def _encode(event_type, message):
+    """(kind, payload bytes); anything unusual is stored as JSON."""
+    try:
+        if event_type == Events.TimeOfFlight:
+            sensor = TOF_SENSORS.index(message["sensorPosition"])
+            return KIND_TOF, TOF.pack(sensor, message["distanceInMeters"])
+        if event_type == Events.FaceRecognition:
+            label = str(message.get("label", "")).encode("utf-8")
+            return KIND_FACE, FACE.pack(message.get("confidence") or 0.0) + label
+        if event_type == Events.TouchSensor:
+            sensor = TOUCH_SENSORS.index(message["sensorPosition"])
+            return KIND_TOUCH, TOUCH.pack(sensor, bool(message["isContacted"]))
+    except (KeyError, ValueError, TypeError, struct.error):
+        pass
+    return KIND_OTHER, json.dumps({"type": event_type, "message": message}).encode("utf-8")
+
+
+def _decode(kind, payload):
+    """(event type, message) for one record."""
+    if kind == KIND_TOF:
+        sensor, distance = TOF.unpack(payload)
+        return EVENT_TYPES[kind], {
+            "sensorPosition": TOF_SENSORS[sensor], "distanceInMeters": round(distance, 4),
+        }
+    if kind == KIND_FACE:
+        (confidence,) = FACE.unpack_from(payload)
+        label = payload[FACE.size:].decode("utf-8")
+        return EVENT_TYPES[kind], {"label": label, "confidence": round(confidence, 4)}
+    if kind == KIND_TOUCH:
+        sensor, contacted = TOUCH.unpack(payload)
+        return EVENT_TYPES[kind], {
+            "sensorPosition": TOUCH_SENSORS[sensor], "isContacted": bool(contacted),
+        }
+    record = json.loads(payload.decode("utf-8"))
+    return record["type"], record["message"]
+
+
+# --------------------------------------
+# RECORDING
+# --------------------------------------
+
+class SensorRecorder:
+    """Appends events to a .msr file; safe to call from any thread."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, event_type, message, received=None):
+        kind, payload = _encode(event_type, message)
+        record = RECORD.pack(time.time() if received is None else received, kind, len(payload))
+        with self._lock:
+            self.file.write(record + payload)
+            self.count += 1
+            if self.count % FLUSH_EVERY == 0:
+                self.file.flush()
+
+    def tap(self, callback, event_type):
+        """Wrap a mistyPy callback so every event is recorded before it is handled."""
+        def record_and_forward(data):
+            message = data.get("message")
+            if isinstance(message, dict):
+                self.write(event_type, message)
+            return callback(data)
+        return record_and_forward
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+        print(f"Recorded {self.count} sensor events to {self.path}")
+
+
+def read_events(path):
+    """Yield (time received, event type, message) for every recorded event."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a sensor recording")
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return  # end of file (or a record cut off by a crash)
+            received, kind, length = RECORD.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            event_type, message = _decode(kind, payload)
+            yield received, event_type, message
+
+
+# --------------------------------------
+# REPLAY
+# --------------------------------------
+
+class RecordingSink:
+    """
+    Stands in for the robot during replay: every command is accepted and
+    logged as (event number, seconds into the session, command, args).
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.event = 0
+        self.offset = 0.0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            with self._lock:
+                self.calls.append([self.event, round(self.offset, 3), name,
+                                   [repr(a) for a in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())]])
+        return command
+
+    def outputs(self):
+        """The calls in a stable order (commands of one step run in parallel)."""
+        with self._lock:
+            return sorted(self.calls, key=lambda call: (call[0], call[2], call[3]))
+
+
+def replay(path, handlers, speed=0.0, sink=None):
+    """
+    Feed a recording into handlers {event type: handler(data, now)}.
+    speed: 1 = real time, 2 = twice as fast, 0 = as fast as possible.
+    Returns (events handled, wall seconds).
+    """
+    start = time.monotonic()
+    first = None
+    handled = 0
+    for number, (received, event_type, message) in enumerate(read_events(path)):
+        handler = handlers.get(event_type)
+        if handler is None:
+            continue
+        if first is None:
+            first = received
+        if speed > 0:
+            delay = start + (received - first) / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if sink is not None:
+            sink.event = number
+            sink.offset = received - first
+        handler({"eventName": f"replay_{event_type}", "message": message}, received)
+        handled += 1
+    return handled, time.monotonic() - start
+
+
+def replay_greeting(path, speed=0.0, verbose=False):
+    """Replay a recording through a fresh GreetingSkill; returns the sink."""
+    from greetingSkill import GreetingSkill
+    from robotState import ShadowRobot
+
+    sink = RecordingSink()
+    misty = ShadowRobot(sink)
+    skill = GreetingSkill(misty, verbose=verbose)
+    skill.go_neutral()
+    handled, elapsed = replay(path, skill.handlers(), speed, sink)
+    print(f"Replayed {handled} events in {elapsed:.2f} s "
+          f"({handled / elapsed if elapsed else float('inf'):.0f} events/s)")
+    print(misty.report())
+    return sink
+
+
+def compare_outputs(expected, actual, limit=10):
+    """Print the first differences between two replays; returns True if equal."""
+    if expected == actual:
+        print(f"Robot output unchanged ({len(actual)} commands).")
+        return True
+    print(f"Robot output differs: {len(expected)} commands before, {len(actual)} now.")
+    shown = 0
+    for before, now in zip(expected, actual):
+        if before != now:
+            print(f"  before: {before}\n  now:    {now}")
+            shown += 1
+            if shown >= limit:
+                break
+    return False
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sensor recording tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="summarize a recording")
+    info.add_argument("file")
+    play = commands.add_parser("replay", help="replay a recording through the greeting skill")
+    play.add_argument("file")
+    play.add_argument("--speed", type=float, default=0.0,
+                      help="1 = real time, 0 = as fast as possible (default)")
+    play.add_argument("--save", metavar="JSON", help="save the robot output")
+    play.add_argument("--compare", metavar="JSON", help="compare with a saved robot output")
+    play.add_argument("--verbose", action="store_true", help="show the skill's own output")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        counts = {}
+        first = last = None
+        for received, event_type, _ in read_events(args.file):
+            counts[event_type] = counts.get(event_type, 0) + 1
+            first = received if first is None else first
+            last = received
+        duration = 0.0 if first is None else last - first
+        print(f"{args.file}: {sum(counts.values())} events over {duration:.1f} s")
+        for event_type, count in sorted(counts.items()):
+            print(f"  {event_type:<20}{count:>8}")
+        sys.exit(0)
+
+    sink = replay_greeting(args.file, args.speed, args.verbose)
+    outputs = sink.outputs()
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(outputs, f)
+        print(f"Saved {len(outputs)} robot commands to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            expected = json.load(f)
+        sys.exit(0 if compare_outputs(expected, outputs) else 1)
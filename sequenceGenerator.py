@@ -0,0 +1,188 @@
+import random
+from collections.abc import Sequence
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+
+MAX_RUN = 3             # never show the same color more than this in a row
+MAX_ROUNDS = None       # rounds per difficulty before the player has won; None = no limit
+SEPARATOR = "white"     # shown between colors, so never part of a sequence
+
+
+# --------------------------------------
+# PREDEFINED SEQUENCES
+# --------------------------------------
+# Hand-made rounds per difficulty (wizard command 2 <difficulty> <round>)
+
+DIFFICULTY_SEQUENCES = {
+    1: [
+        ["green"],
+        ["green", "blue"],
+        ["green", "blue", "blue"],
+        ["green", "blue", "blue", "blue"],
+        ["green", "blue", "blue", "blue", "green"],
+        ["green", "blue", "blue", "blue", "green", "blue"],
+    ],
+    2: [
+        ["green", "blue"],
+        ["green", "blue", "yellow"],
+        ["green", "yellow", "blue", "yellow"],
+        ["blue", "blue", "green", "yellow"],
+        ["yellow", "green", "blue", "blue", "green"],
+        ["yellow", "blue", "green", "yellow", "blue", "green"],
+    ],
+    3: [
+        ["red", "green"],
+        ["red", "green", "blue"],
+        ["red", "blue", "green", "yellow"],
+        ["green", "yellow", "red", "blue"],
+        ["blue", "red", "yellow", "green", "blue"],
+        ["yellow", "blue", "red", "green", "yellow", "blue"],
+    ],
+    4: [
+        ["purple", "green"],
+        ["purple", "green", "blue"],
+        ["purple", "blue", "yellow", "green"],
+        ["yellow", "purple", "green", "blue"],
+        ["green", "purple", "blue", "yellow", "purple"],
+        ["yellow", "green", "purple", "blue", "yellow", "green"],
+    ],
+    5: [
+        ["red", "blue", "green"],
+        ["red", "blue", "green", "yellow"],
+        ["yellow", "red", "blue", "green", "purple"],
+        ["green", "purple", "yellow", "red", "blue"],
+        ["purple", "yellow", "green", "blue", "red", "yellow"],
+        ["blue", "green", "purple", "yellow", "red", "green"],
+    ],
+}
+
+
+def _colors_used(rounds):
+    """Colors in the order the rounds first show them."""
+    return list(dict.fromkeys(color for sequence in rounds for color in sequence))
+
+
+# Colors and round 1's length per difficulty, as in the table. Higher
+# difficulties use every color the table uses and start like the hardest.
+PALETTES = {d: _colors_used(rounds) for d, rounds in DIFFICULTY_SEQUENCES.items()}
+TABLE_COLORS = _colors_used(sequence for rounds in DIFFICULTY_SEQUENCES.values()
+                            for sequence in rounds)
+START_LENGTH = {d: len(rounds[0]) for d, rounds in DIFFICULTY_SEQUENCES.items()}
+DEFAULT_START_LENGTH = START_LENGTH[max(START_LENGTH)]
+
+
+# --------------------------------------
+# ONE ROUND
+# --------------------------------------
+
+class Round(Sequence):
+    """
+    The first `length` colors of a difficulty's sequence.
+    Rounds share one growing list, so creating one is O(1).
+    """
+
+    def __init__(self, colors, length):
+        self._colors = colors
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._colors[:self._length][index]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("round index out of range")
+        return self._colors[index]
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self._colors[i]
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+# --------------------------------------
+# SEQUENCE SOURCES
+# --------------------------------------
+
+class FixedSequences:
+    """The hand-typed table; rounds outside it (or past max_rounds) don't exist."""
+
+    def __init__(self, table, max_rounds=None):
+        self.table = table
+        self.seed = None
+        self.max_rounds = max_rounds
+
+    def sequence(self, difficulty, round_number):
+        """Colors for this round, or None if it isn't in the table."""
+        rounds = self.table.get(difficulty)
+        if not rounds or not 1 <= round_number <= len(rounds):
+            return None
+        if self.max_rounds is not None and round_number > self.max_rounds:
+            return None
+        return rounds[round_number - 1]
+
+
+class SequenceGenerator:
+    """
+    Seeded Simon-style sequences for any difficulty and round.
+
+    Every round repeats the previous one and adds one color, so going to
+    the next round appends to a list instead of building a new one. Each
+    difficulty has its own random stream derived from the seed, so the
+    same seed gives the same sequences whatever order rounds are asked in.
+    """
+
+    def __init__(self, seed, color_map, max_rounds=MAX_ROUNDS):
+        self.seed = seed
+        self.color_map = color_map
+        self.max_rounds = max_rounds
+        self._colors = {}   # difficulty -> the longest sequence so far
+        self._streams = {}  # difficulty -> random.Random
+
+    def palette(self, difficulty):
+        names = PALETTES.get(difficulty, TABLE_COLORS)
+        return [n for n in names if n in self.color_map and n != SEPARATOR]
+
+    def _extend(self, difficulty, length):
+        colors = self._colors.get(difficulty)
+        if colors is None:
+            colors = self._colors[difficulty] = []
+            self._streams[difficulty] = random.Random(f"{self.seed}:{difficulty}")
+        stream = self._streams[difficulty]
+        palette = self.palette(difficulty)
+
+        while len(colors) < length:
+            choices = palette
+            run = colors[-MAX_RUN:]
+            if len(palette) > 1 and len(run) == MAX_RUN and len(set(run)) == 1:
+                choices = [c for c in palette if c != run[0]]
+            colors.append(stream.choice(choices))
+        return colors
+
+    def sequence(self, difficulty, round_number):
+        """
+        Colors for this round, or None for a difficulty below 1, a round
+        below 1 or, when there is a max_rounds, a round past it.
+        """
+        if difficulty < 1 or round_number < 1:
+            return None
+        if self.max_rounds is not None and round_number > self.max_rounds:
+            return None
+        length = START_LENGTH.get(difficulty, DEFAULT_START_LENGTH) + round_number - 1
+        return Round(self._extend(difficulty, length), length)
+
+    @property
+    def table(self):
+        """Rounds generated so far, in the shape of DIFFICULTY_SEQUENCES."""
+        table = {}
+        for difficulty, colors in self._colors.items():
+            start = START_LENGTH.get(difficulty, DEFAULT_START_LENGTH)
+            table[difficulty] = [Round(colors, n) for n in range(start, len(colors) + 1)]
+        return table
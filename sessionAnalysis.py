@@ -0,0 +1,304 @@
+"""
+Accuracy, span, response latency and drop-off from the session logs.
+
+    python sessionAnalysis.py                                  # all of session_logs/
+    python sessionAnalysis.py session_logs/2026-10-17.msl --by persona difficulty
+    python sessionAnalysis.py --drop-off                       # curves per persona
+    python sessionAnalysis.py --drop-off --drop-off-by persona difficulty
+    python sessionAnalysis.py --csv rounds.csv                 # one row per round
+
+A round's outcome is the verdict the wizard gave next on the same robot,
+before the next round: a scored answer (wizard command 12), or else the
+line they sent (playerCorrect/playerWon = correct, playerLost = wrong).
+Its response latency is the time from the end of the LED sequence to
+that verdict. Each round is joined with DIFFICULTY_SEQUENCES to get the
+length of the sequence shown, and flagged when the logged sequence
+wasn't the table's (generated sequences, edited table).
+
+Every step works on whole NumPy columns; nothing loops over rounds in
+Python, so thousands of sessions take well under a second.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from sequenceGenerator import DIFFICULTY_SEQUENCES
+from sessionLog import LOG_DIR, read_columns
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+CORRECT_LINES = ("playerCorrect", "playerWon")
+WRONG_LINES = ("playerLost",)
+GROUP_COLUMNS = ("participant", "persona", "difficulty")
+DROP_OFF_COLUMNS = ("persona",)  # each drop-off curve covers many sessions
+LOG_COLUMNS = ("ts", "participant", "persona", "robot", "event", "name",
+               "difficulty", "round", "sequence", "outcome")
+
+
+# --------------------------------------
+# LOADING
+# --------------------------------------
+
+def _text(values):
+    """A text column as a NumPy string array."""
+    return np.array(values, dtype=str) if len(values) else np.array([], dtype="<U1")
+
+
+def sequence_table(sequences=DIFFICULTY_SEQUENCES):
+    """
+    (lengths, texts): arrays indexed [difficulty, round] with the length
+    and the space-joined colors of every sequence in the table (-1 / "").
+    """
+    rows = max(sequences) + 1
+    columns = max(len(rounds) for rounds in sequences.values()) + 1
+    lengths = np.full((rows, columns), -1, dtype=np.int16)
+    texts = np.full((rows, columns), "", dtype=object)
+    for difficulty, rounds in sequences.items():
+        for number, sequence in enumerate(rounds, 1):
+            lengths[difficulty, number] = len(sequence)
+            texts[difficulty, number] = " ".join(sequence)
+    return lengths, texts.astype(str)
+
+
+class Rounds:
+    """
+    One entry per LED sequence played, as parallel NumPy arrays:
+    participant, persona, robot (str), difficulty, round, length (int),
+    ts (s), in_table (bool), correct (1, 0, or -1 if never scored) and
+    latency (s to the verdict, NaN if never scored).
+    """
+
+    COLUMNS = ("ts", "participant", "persona", "robot", "difficulty", "round",
+               "length", "in_table", "correct", "latency")
+
+    def __init__(self, **columns):
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def scored(self):
+        return self.correct >= 0
+
+    def to_dataframe(self):
+        """The rounds as a pandas DataFrame (needs pandas)."""
+        try:
+            import pandas
+        except ImportError as e:
+            raise ImportError("to_dataframe() needs pandas: pip install pandas") from e
+        return pandas.DataFrame({name: getattr(self, name) for name in self.COLUMNS})
+
+
+def load(path=LOG_DIR, sequences=DIFFICULTY_SEQUENCES):
+    """Read a log file or directory and pair every round with its verdict."""
+    data = read_columns(path, LOG_COLUMNS)
+    ts = np.frombuffer(data["ts"], dtype=np.float64)
+    robot = _text(data["robot"])
+    order = np.lexsort((ts, robot))  # each robot's records in time order
+    ts, robot = ts[order], robot[order]
+    event = _text(data["event"])[order]
+    name = _text(data["name"])[order]
+    outcome = _text(data["outcome"])[order]
+    n = len(ts)
+
+    played = (event == "round") & (outcome == "played")
+    # A scored answer (wizard command 12) comes before the line it triggers
+    scored = event == "response"
+    correct_verdict = ((event == "say") & np.isin(name, CORRECT_LINES)
+                       | scored & (outcome == "correct"))
+    verdict = correct_verdict | ((event == "say") & np.isin(name, WRONG_LINES)) | scored
+    # A verdict only counts for the round right before it: any other round
+    # record (cancelled, error) or a new participant ends the search.
+    boundary = (event == "round") | (event == "session")
+
+    index = np.arange(n + 1)
+    next_verdict = _next_true(np.append(verdict, False), index)
+    next_boundary = _next_true(np.append(boundary, False), index)
+
+    rows = np.flatnonzero(played)
+    after = rows + 1
+    found = next_verdict[after]
+    valid = (found < n) & (found < next_boundary[after])
+    found = np.where(valid, found, 0)
+    valid &= robot[found] == robot[rows]
+
+    difficulty = np.frombuffer(data["difficulty"], dtype=np.int16)[order][rows]
+    round_number = np.frombuffer(data["round"], dtype=np.int16)[order][rows]
+    shown = _text(data["sequence"])[order][rows]
+    lengths, texts = sequence_table(sequences)
+    in_range = ((difficulty >= 0) & (difficulty < lengths.shape[0])
+                & (round_number >= 0) & (round_number < lengths.shape[1]))
+    d = np.where(in_range, difficulty, 0)
+    r = np.where(in_range, round_number, 0)
+    in_table = in_range & (texts[d, r] == shown)
+
+    # Length of what was shown: from the logged colors (per distinct string)
+    distinct, inverse = np.unique(shown, return_inverse=True)
+    distinct_lengths = np.char.count(distinct, " ") + (np.char.str_len(distinct) > 0)
+    length = distinct_lengths[inverse].astype(np.int16)
+
+    return Rounds(
+        ts=ts[rows],
+        participant=_text(data["participant"])[order][rows],
+        persona=_text(data["persona"])[order][rows],
+        robot=robot[rows],
+        difficulty=difficulty,
+        round=round_number,
+        length=np.where(length > 0, length, np.where(in_range, lengths[d, r], -1)),
+        in_table=in_table,
+        correct=np.where(valid, correct_verdict[found].astype(np.int8), -1).astype(np.int8),
+        latency=np.where(valid, ts[found] - ts[rows], np.nan),
+    )
+
+
+def _next_true(mask, index):
+    """For every position, the index of the next True at or after it (len-1 if none)."""
+    positions = np.where(mask, index, len(mask) - 1)
+    return np.minimum.accumulate(positions[::-1])[::-1]
+
+
+# --------------------------------------
+# SUMMARIES
+# --------------------------------------
+
+def _groups(rounds, by):
+    """(keys {column: array per group}, group index per round)."""
+    columns = [getattr(rounds, column) for column in by]
+    codes = []
+    uniques = []
+    for values in columns:
+        unique, inverse = np.unique(values, return_inverse=True)
+        uniques.append(unique)
+        codes.append(inverse)
+    if not codes:
+        return {}, np.zeros(len(rounds), dtype=np.intp)
+    keys, group = np.unique(np.stack(codes, axis=1), axis=0, return_inverse=True)
+    return ({column: unique[keys[:, i]] for i, (column, unique) in enumerate(zip(by, uniques))},
+            group.reshape(-1))
+
+
+def summarize(rounds, by=GROUP_COLUMNS):
+    """
+    Per group: rounds played, rounds scored, correct, accuracy, span (the
+    longest sequence repeated correctly) and mean/max response latency.
+    Returns {column: array}, one entry per group.
+    """
+    keys, group = _groups(rounds, by)
+    count = len(next(iter(keys.values()))) if keys else 1
+    scored = rounds.scored
+    right = rounds.correct == 1
+
+    played = np.bincount(group, minlength=count)
+    n_scored = np.bincount(group, weights=scored, minlength=count).astype(int)
+    n_correct = np.bincount(group, weights=right, minlength=count).astype(int)
+    span = np.zeros(count, dtype=np.int16)
+    np.maximum.at(span, group, np.where(right, rounds.length, 0))
+
+    latency = np.where(scored, rounds.latency, 0.0)
+    mean_latency = np.bincount(group, weights=latency, minlength=count) / np.maximum(n_scored, 1)
+    max_latency = np.zeros(count)
+    np.maximum.at(max_latency, group, latency)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        accuracy = n_correct / n_scored
+    result = dict(keys)
+    result.update(rounds=played, scored=n_scored, correct=n_correct, accuracy=accuracy,
+                  span=span, mean_latency=np.where(n_scored > 0, mean_latency, np.nan),
+                  max_latency=np.where(n_scored > 0, max_latency, np.nan))
+    return result
+
+
+def drop_off(rounds, by=DROP_OFF_COLUMNS):
+    """
+    Share of sessions (participant, persona, difficulty) per group that
+    got to round 1, 2, ... Returns (keys {column: array}, curves
+    [group, round]); curves[:, 0] is always 1.
+    """
+    sessions, session = _groups(rounds, GROUP_COLUMNS)
+    n_sessions = len(next(iter(sessions.values()))) if len(rounds) else 0
+    reached = np.zeros(n_sessions, dtype=np.int16)
+    np.maximum.at(reached, session, rounds.round)
+
+    # One representative round per session gives the session's group
+    first = np.unique(session, return_index=True)[1]
+    keys, group_of_round = _groups(rounds, by)
+    group = group_of_round[first]
+    count = len(next(iter(keys.values()))) if keys else 1
+
+    longest = int(reached.max()) if n_sessions else 0
+    ended = np.zeros((count, longest + 1))
+    np.add.at(ended, (group, reached), 1)
+    # still playing at round r = sessions that reached r or later
+    at_least = np.cumsum(ended[:, ::-1], axis=1)[:, ::-1]
+    curves = at_least[:, 1:] / np.maximum(at_least[:, :1], 1)
+    return keys, curves
+
+
+# --------------------------------------
+# OUTPUT
+# --------------------------------------
+
+def print_summary(summary, by):
+    header = [*by, "rounds", "scored", "correct", "acc", "span", "lat s", "max s"]
+    widths = [max([len(column)] + [len(str(v)) for v in summary[column]]) for column in by]
+    print("  ".join(f"{h:<{w}}" for h, w in zip(header, widths)) + "  "
+          + "  ".join(f"{h:>7}" for h in header[len(by):]))
+    for i in range(len(summary["rounds"])):
+        keys = "  ".join(f"{str(summary[c][i]):<{w}}" for c, w in zip(by, widths))
+        print(f"{keys}  {summary['rounds'][i]:>7}  {summary['scored'][i]:>7}  "
+              f"{summary['correct'][i]:>7}  {summary['accuracy'][i]:>7.0%}  "
+              f"{summary['span'][i]:>7}  {summary['mean_latency'][i]:>7.1f}  "
+              f"{summary['max_latency'][i]:>7.1f}")
+
+
+def print_drop_off(keys, curves, by):
+    labels = [" / ".join(str(keys[c][i]) for c in by) for i in range(curves.shape[0])]
+    width = max([len(" / ".join(by))] + [len(label) for label in labels])
+    print("Share of sessions still playing at round:")
+    print(f"{' / '.join(by):<{width}}  " + "  ".join(f"{r:>5}" for r in range(1, curves.shape[1] + 1)))
+    for label, curve in zip(labels, curves):
+        print(f"{label:<{width}}  " + "  ".join(f"{v:>5.0%}" for v in curve))
+
+
+def save_csv(rounds, path):
+    columns = [getattr(rounds, name) for name in Rounds.COLUMNS]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(Rounds.COLUMNS) + "\n")
+        np.savetxt(f, np.column_stack(columns).astype(str), fmt="%s", delimiter=",")
+    print(f"Saved {len(rounds)} rounds to {path}")
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory game session analysis")
+    parser.add_argument("path", nargs="?", default=LOG_DIR, help="log file or directory")
+    parser.add_argument("--by", nargs="+", default=list(GROUP_COLUMNS),
+                        choices=["participant", "persona", "robot", "difficulty", "round"])
+    parser.add_argument("--drop-off", action="store_true", help="print drop-off curves")
+    parser.add_argument("--drop-off-by", nargs="+", default=list(DROP_OFF_COLUMNS),
+                        choices=["participant", "persona", "robot", "difficulty"],
+                        help="one drop-off curve per group of sessions (default: persona)")
+    parser.add_argument("--csv", metavar="FILE", help="save one row per round")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rounds = load(args.path)
+    if not len(rounds):
+        sys.exit(f"No rounds logged in {args.path}")
+    print_summary(summarize(rounds, args.by), args.by)
+    if args.drop_off:
+        print()
+        print_drop_off(*drop_off(rounds, args.drop_off_by), args.drop_off_by)
+    if args.csv:
+        save_csv(rounds, args.csv)
+    print(f"\n{len(rounds)} rounds ({int(rounds.scored.sum())} scored, "
+          f"{int((~rounds.in_table).sum())} not from DIFFICULTY_SEQUENCES) "
+          f"analyzed in {time.perf_counter() - started:.2f} s")
@@ -0,0 +1,344 @@
+"""
+Structured log of every round, line and behavior, for analysis later.
+
+    python memoryGame.py 1 --participant P07
+    python test.py --participant P07
+    python sessionLog.py info session_logs/
+    python sessionLog.py tail session_logs/ -n 20
+
+Records are typed (see SCHEMA) and written by a background thread in
+blocks of up to BLOCK_ROWS rows, so log() never waits for the disk. Each
+block stores its columns separately and compressed: a scan that needs
+only a few columns (say latency_ms and outcome over months of sessions)
+skips the bytes of all the others. Files are append-only, one per day; several processes (two wizards, the
+wizard and test.py) can log to the same file, each block is written under
+an exclusive file lock.
+"""
+import argparse
+import atexit
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_logs")
+BLOCK_ROWS = 512      # records per block; a full buffer is written right away
+FLUSH_INTERVAL = 2.0  # s; anything buffered is written at least this often
+
+# Column name -> array typecode, or str for (dictionary-encoded) text
+SCHEMA = (
+    ("ts", "d"),            # time.time()
+    ("participant", str),
+    ("persona", str),
+    ("robot", str),
+    ("event", str),         # command, round, say, behavior, session
+    ("name", str),          # wizard command, dialogue key, reaction, ...
+    ("difficulty", "h"),    # -1 if not a round
+    ("round", "h"),
+    ("sequence", str),      # colors, space separated
+    ("outcome", str),
+    ("latency_ms", "f"),    # NaN if not measured
+    ("detail", str),
+)
+COLUMNS = tuple(name for name, _ in SCHEMA)
+MISSING = {"d": math.nan, "f": math.nan, "h": -1, str: ""}
+
+# --------------------------------------
+# FILE FORMAT
+# --------------------------------------
+# "MSL1", <H schema JSON length, schema JSON, then blocks:
+#   <II   rows, bytes of the block after this header
+#   per column in schema order: <I length, zlib(column)
+# A str column is <I JSON length, JSON list of its distinct values, <H index per row.
+MAGIC = b"MSL1"
+SCHEMA_HEADER = struct.Struct("<H")
+BLOCK = struct.Struct("<II")
+LENGTH = struct.Struct("<I")
+
+
+def _schema_json():
+    return json.dumps([[name, "str" if kind is str else kind] for name, kind in SCHEMA]).encode()
+
+
+def _encode_column(kind, values):
+    if kind is not str:
+        return zlib.compress(array(kind, values).tobytes())
+    table = {}
+    indices = array("H", (table.setdefault(v, len(table)) for v in values))
+    names = json.dumps(list(table)).encode("utf-8")
+    return zlib.compress(LENGTH.pack(len(names)) + names + indices.tobytes())
+
+
+def _decode_column(kind, data):
+    data = zlib.decompress(data)
+    if kind is not str:
+        return array(kind, data)
+    (length,) = LENGTH.unpack_from(data)
+    names = json.loads(data[LENGTH.size:LENGTH.size + length].decode("utf-8"))
+    indices = array("H", data[LENGTH.size + length:])
+    return [names[i] for i in indices]
+
+
+def encode_block(rows):
+    """Bytes of one block (header included) for a list of row tuples."""
+    columns = list(zip(*rows))
+    parts = []
+    for (_, kind), values in zip(SCHEMA, columns):
+        data = _encode_column(kind, values)
+        parts.append(LENGTH.pack(len(data)))
+        parts.append(data)
+    body = b"".join(parts)
+    return BLOCK.pack(len(rows), len(body)) + body
+
+
+# --------------------------------------
+# WRITING
+# --------------------------------------
+
+@contextmanager
+def _locked(file):
+    """Exclusive lock on an open log file against other processes."""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+        return
+    # msvcrt locks bytes from the current position; every process locks byte 0
+    file.seek(0)
+    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+    try:
+        yield
+    finally:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def default_path(day=None):
+    return os.path.join(LOG_DIR, f"{(day or date.today()).isoformat()}.msl")
+
+
+class SessionLog:
+    """
+    Appends typed records to a .msl file from a background thread.
+    Safe to call from any thread; log() only appends to a buffer.
+    """
+
+    def __init__(self, path=None, participant="", robot="",
+                 block_rows=BLOCK_ROWS, flush_interval=FLUSH_INTERVAL):
+        self.path = path or default_path()
+        self.participant = participant
+        self.robot = robot
+        self.block_rows = block_rows
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.blocks = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, "ab")
+        with _locked(self.file):
+            if os.fstat(self.file.fileno()).st_size == 0:
+                schema = _schema_json()
+                self.file.write(MAGIC + SCHEMA_HEADER.pack(len(schema)) + schema)
+                self.file.flush()
+                matches = True
+            else:
+                matches = _read_schema(self.path) == _schema_json()
+        if not matches:
+            self.file.close()
+            raise ValueError(f"{self.path} was written with a different schema")
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="session-log", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def log(self, event, name="", persona="", difficulty=-1, round=-1, sequence=(),
+            outcome="", latency_ms=math.nan, detail=""):
+        """Buffer one record; returns right away."""
+        if not isinstance(sequence, str):
+            sequence = " ".join(sequence)
+        row = (time.time(), self.participant, persona, self.robot, event, str(name),
+               int(difficulty), int(round), sequence, outcome,
+               float("nan" if latency_ms is None else latency_ms), str(detail))
+        with self._lock:
+            if self._closed:
+                return
+            self._buffer.append(row)
+            full = len(self._buffer) >= self.block_rows
+        if full:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if not rows:
+            return
+        blocks = [rows[start:start + self.block_rows]
+                  for start in range(0, len(rows), self.block_rows)]
+        data = b"".join(encode_block(block) for block in blocks)
+        # One write under the lock, so blocks of other processes can't land
+        # in the middle of ours
+        with _locked(self.file):
+            self.file.write(data)
+            self.file.flush()
+        self.count += len(rows)
+        self.blocks += len(blocks)
+
+    def close(self):
+        """Write what's buffered and stop the writer (safe to call twice)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._writer.join()
+        self._flush()
+        self.file.close()
+        print(f"Logged {self.count} session records to {self.path}")
+
+
+def open_session_log(participant, robot=""):
+    """Today's log for this participant, or None without a participant id."""
+    if not participant:
+        return None
+    return SessionLog(participant=participant, robot=robot)
+
+
+# --------------------------------------
+# READING
+# --------------------------------------
+
+def log_files(path):
+    """path itself, or every .msl file in the directory path (oldest first)."""
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith(".msl")]
+    return [path]
+
+
+def _read_schema(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session log")
+        (length,) = SCHEMA_HEADER.unpack(f.read(SCHEMA_HEADER.size))
+        return f.read(length)
+
+
+def read_blocks(path, columns=None):
+    """
+    Yield {column: values} per block of one file; only `columns` (default:
+    all) are decompressed, the rest are skipped.
+    """
+    wanted = set(COLUMNS if columns is None else columns)
+    unknown = wanted - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown columns {sorted(unknown)}, expected {list(COLUMNS)}")
+    if _read_schema(path) != _schema_json():
+        raise ValueError(f"{path} was written with a different schema")
+    with open(path, "rb") as f:
+        f.seek(len(MAGIC))
+        (length,) = SCHEMA_HEADER.unpack(f.read(SCHEMA_HEADER.size))
+        f.seek(length, os.SEEK_CUR)
+        while True:
+            header = f.read(BLOCK.size)
+            if len(header) < BLOCK.size:
+                return  # end of file (or a block cut off by a crash)
+            rows, size = BLOCK.unpack(header)
+            body = f.read(size)
+            if len(body) < size:
+                return
+            block = {}
+            offset = 0
+            for name, kind in SCHEMA:
+                (length,) = LENGTH.unpack_from(body, offset)
+                offset += LENGTH.size
+                if name in wanted:
+                    block[name] = _decode_column(kind, body[offset:offset + length])
+                offset += length
+            yield block
+
+
+def read_columns(path, columns=None):
+    """
+    {column: values} over a log file or a directory of them. Numeric
+    columns are array.array (numpy.frombuffer reads them without a copy),
+    text columns are lists.
+    """
+    names = COLUMNS if columns is None else tuple(columns)
+    kinds = dict(SCHEMA)
+    result = {name: [] if kinds[name] is str else array(kinds[name]) for name in names}
+    for file in log_files(path):
+        for block in read_blocks(file, names):
+            for name in names:
+                result[name].extend(block[name])
+    return result
+
+
+def rows(columns):
+    """Turn read_columns() output back into one dict per record."""
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*(columns[n] for n in names))]
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Session log tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="summarize a log file or directory")
+    info.add_argument("path", nargs="?", default=LOG_DIR)
+    tail = commands.add_parser("tail", help="print the last records")
+    tail.add_argument("path", nargs="?", default=LOG_DIR)
+    tail.add_argument("-n", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == "info":
+        files = log_files(args.path)
+        size = sum(os.path.getsize(f) for f in files)
+        data = read_columns(args.path, ["ts", "participant", "event"])
+        print(f"{len(files)} files, {size / 1024:.1f} KB, {len(data['ts'])} records")
+        if data["ts"]:
+            first, last = min(data["ts"]), max(data["ts"])
+            print(f"  {datetime.fromtimestamp(first):%Y-%m-%d %H:%M} .. "
+                  f"{datetime.fromtimestamp(last):%Y-%m-%d %H:%M}")
+        print(f"  participants: {', '.join(sorted(set(data['participant']) - {''})) or '-'}")
+        for event in sorted(set(data["event"])):
+            print(f"  {event:<12}{data['event'].count(event):>8}")
+        sys.exit(0)
+
+    for record in rows(read_columns(args.path))[-args.n:]:
+        when = datetime.fromtimestamp(record.pop("ts")).strftime("%Y-%m-%d %H:%M:%S")
+        fields = ", ".join(f"{k}={v}" for k, v in record.items()
+                           if v not in ("", -1) and v == v)
+        print(when, fields)
@@ -0,0 +1,220 @@
+"""
+Pre-rendered speech for the memory game.
+
+Build step (run once on the wizard laptop, needs pyttsx3):
+
+    python speechCache.py build
+    python speechCache.py upload <robot ip>
+
+Every line the games can say is rendered to a .wav with a local offline
+TTS engine and uploaded to Misty under a name derived from its content
+hash. At runtime SpeechPacer plays the cached clip instead of asking
+Misty to synthesize the line, and falls back to live TTS on a miss.
+"""
+import base64
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "speech_cache")
+MANIFEST = "manifest.json"
+CLIP_PREFIX = "tts_"
+SPEECH_RATE = 170  # words per minute for the offline engine
+
+
+def _load_manifest(cache_dir):
+    path = os.path.join(cache_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def _wav_duration(path):
+    with wave.open(path, "rb") as clip:
+        return clip.getnframes() / float(clip.getframerate())
+
+
+# --------------------------------------
+# BUILD: RENDER EVERY LINE OFFLINE
+# --------------------------------------
+
+def game_lines():
+    """All lines of every persona of the memory game, without duplicates."""
+    import memoryGame
+    from personas import PERSONAS
+
+    lines = {}
+    for persona in PERSONAS.values():
+        lines.update(dict.fromkeys(memoryGame.all_lines(persona)))
+    return list(lines)
+
+
+def build(lines, cache_dir=CACHE_DIR):
+    """
+    Render every line that isn't in the manifest yet.
+    Clips are named by the hash of their audio, so identical audio is
+    stored (and uploaded) only once.
+    """
+    try:
+        import pyttsx3
+    except ImportError as e:
+        raise ImportError("Building the speech cache needs pyttsx3: pip install pyttsx3") from e
+
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _load_manifest(cache_dir)
+    missing = [text for text in lines if text not in manifest]
+    if not missing:
+        print(f"Speech cache up to date ({len(manifest)} lines).")
+        return manifest
+
+    engine = pyttsx3.init()
+    engine.setProperty("rate", SPEECH_RATE)
+    with tempfile.TemporaryDirectory() as tmp:
+        rendered = []
+        for i, text in enumerate(missing):
+            path = os.path.join(tmp, f"{i}.wav")
+            engine.save_to_file(text, path)
+            rendered.append((text, path))
+        engine.runAndWait()
+
+        for text, path in rendered:
+            with open(path, "rb") as f:
+                audio = f.read()
+            name = CLIP_PREFIX + hashlib.sha1(audio).hexdigest()[:16] + ".wav"
+            with open(os.path.join(cache_dir, name), "wb") as f:
+                f.write(audio)
+            manifest[text] = {"file": name, "duration": _wav_duration(path)}
+
+    _save_manifest(cache_dir, manifest)
+    print(f"Rendered {len(missing)} new lines ({len(manifest)} in cache).")
+    return manifest
+
+
+# --------------------------------------
+# UPLOAD: PUSH MISSING CLIPS TO THE ROBOT
+# --------------------------------------
+
+def cached_clips(cache_dir=CACHE_DIR):
+    """File names of every clip in the cache."""
+    return {entry["file"] for entry in _load_manifest(cache_dir).values()}
+
+
+def robot_audio_files(transport):
+    """Names of the audio files already on the robot (one request)."""
+    response = transport.get("audio/list")
+    return {
+        item.get("name") or item.get("Name")
+        for item in response.json().get("result") or []
+    }
+
+
+def upload(transport, cache_dir=CACHE_DIR, on_robot=None, deadline=None):
+    """
+    Upload every cached clip the robot doesn't have yet, or as many as fit
+    before `deadline` (time.monotonic()); the rest go up next time.
+    """
+    if on_robot is None:
+        on_robot = robot_audio_files(transport)
+
+    names = sorted(cached_clips(cache_dir) - on_robot)
+    uploaded = 0
+    for name in names:
+        timeout = None
+        if deadline is not None:
+            if time.monotonic() >= deadline:
+                break
+            timeout = max(0.1, deadline - time.monotonic())
+        with open(os.path.join(cache_dir, name), "rb") as f:
+            data = base64.b64encode(f.read()).decode("ascii")
+        try:
+            transport.post("audio", {
+                "FileName": name,
+                "Data": data,
+                "ImmediatelyApply": False,
+                "OverwriteExisting": True,
+            }, timeout=timeout)
+        except Exception:
+            if deadline is None or time.monotonic() < deadline:
+                raise
+            break  # cut off by the deadline; it goes up next time
+        on_robot.add(name)
+        uploaded += 1
+    print(f"Uploaded {uploaded} of {len(names)} clips, {len(on_robot)} audio files on robot.")
+    return on_robot
+
+
+# --------------------------------------
+# RUNTIME LOOKUP
+# --------------------------------------
+
+class SpeechCache:
+    """Maps a line of text to a clip that is known to be on the robot."""
+
+    def __init__(self, manifest, on_robot):
+        self.manifest = manifest
+        self.on_robot = on_robot
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, transport, cache_dir=CACHE_DIR):
+        """
+        Cache for this robot, or None if nothing was built yet or the
+        robot can't be asked for its audio list.
+        """
+        manifest = _load_manifest(cache_dir)
+        if not manifest:
+            return None
+        try:
+            on_robot = robot_audio_files(transport)
+        except Exception as e:
+            print("Speech cache disabled, could not list robot audio:", e)
+            return None
+        return cls(manifest, on_robot)
+
+    def lookup(self, text):
+        """(file name, duration s) of the cached clip, or None on a miss."""
+        entry = self.manifest.get(text)
+        with self._lock:
+            if entry is None or entry["file"] not in self.on_robot:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return entry["file"], entry["duration"]
+
+
+# --------------------------------------
+# MAIN
+# --------------------------------------
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("build", "upload"):
+        sys.exit("Usage: python speechCache.py build | upload <robot ip>")
+
+    if sys.argv[1] == "build":
+        try:
+            build(game_lines())
+        except ImportError as e:
+            sys.exit(str(e))
+    else:
+        from mistyTransport import get_transport
+
+        if len(sys.argv) < 3:
+            sys.exit("Usage: python speechCache.py upload <robot ip>")
+        upload(get_transport(sys.argv[2]))
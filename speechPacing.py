@@ -0,0 +1,169 @@
+import threading
+import time
+import uuid
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+WORDS_PER_SECOND = 2.5  # Misty's default speaking rate, roughly
+SPEECH_SLACK = 1.5      # s added to the estimate before giving up on the event
+CANCEL_POLL = 0.05      # s between checks of a cancel event while waiting
+
+
+def estimate_duration(text):
+    """Rough length of an utterance, used as the fallback timeout."""
+    return len(text.split()) / WORDS_PER_SECOND + SPEECH_SLACK
+
+
+# --------------------------------------
+# SPEECH PACER
+# --------------------------------------
+
+class SpeechPacer:
+    """
+    speak() tags every line with an utterance id; wait() blocks until Misty
+    sends TextToSpeechComplete for that id, or until a fallback timeout if
+    the event never arrives.
+
+    With a SpeechCache, lines that were pre-rendered are played as audio
+    clips instead (no synthesis on the robot); their length is known, so
+    wait() simply waits for the clip to end.
+    """
+
+    def __init__(self, misty, cache=None):
+        self.misty = misty
+        self.cache = cache
+        self._pending = {}  # utterance id -> (threading.Event, fallback s)
+        self._clips = {}    # utterance id -> monotonic time the clip ends
+        self._clip_until = 0.0  # monotonic time the latest clip ends
+        self._lock = threading.Lock()
+        self.subscribed = False
+        self.event_name = f"tts_complete_{id(self)}"
+
+        try:
+            from mistyPy.Events import Events  # with the robot, not at import
+
+            misty.register_event(
+                event_name=self.event_name,
+                event_type=Events.TextToSpeechComplete,
+                callback_function=self._on_complete,
+                keep_alive=True,
+            )
+            self.subscribed = True
+        except Exception as e:
+            print("Could not subscribe to TextToSpeechComplete, using timeouts:", e)
+
+    def _on_complete(self, data):
+        message = data.get("message") or {}
+        utterance_id = message.get("utteranceId") or message.get("UtteranceId")
+        # Finished lines are forgotten right away; wait() treats an unknown
+        # id as already done.
+        with self._lock:
+            pending = self._pending.pop(utterance_id, None)
+        if pending is not None:
+            pending[0].set()
+
+    def speak(self, text, pitch=None, flush=None):
+        """
+        Start speaking and return the utterance id right away.
+        flush: cut off whatever Misty is saying or playing first.
+        """
+        utterance_id = uuid.uuid4().hex
+
+        # Cached clips are rendered with the default voice only
+        clip = None
+        if self.cache is not None and pitch is None:
+            clip = self.cache.lookup(text)
+        if clip is not None:
+            name, duration = clip
+            if flush:
+                # play_audio has no Flush; stop live speech and the last clip
+                self.misty.stop_speaking()
+                self._stop_clip()
+            self.misty.play_audio(name)
+            with self._lock:
+                self._clips.clear()  # only the latest clip can still be playing
+                self._clip_until = time.monotonic() + duration
+                self._clips[utterance_id] = self._clip_until
+            return utterance_id
+
+        if flush:
+            self._stop_clip()  # Flush only clears the speech queue
+
+        with self._lock:
+            if not self.subscribed:
+                # Nobody will confirm these, keep only the latest line
+                self._pending.clear()
+            self._pending[utterance_id] = (threading.Event(), estimate_duration(text))
+        self.misty.speak(text, pitch, flush=flush, utteranceId=utterance_id)
+        return utterance_id
+
+    def wait(self, utterance_id, timeout=None, cancel=None):
+        """
+        Block until the utterance finished.
+        timeout: fallback in seconds (default: estimated from the text).
+        cancel: optional threading.Event that ends the wait early.
+        Returns True if Misty confirmed, False if the fallback kicked in
+        or the wait was cancelled.
+        """
+        with self._lock:
+            clip_end = self._clips.pop(utterance_id, None)
+            pending = self._pending.get(utterance_id)
+        if clip_end is not None:
+            return not _wait_for(None, clip_end, cancel)
+        if pending is None:
+            return True
+
+        done, fallback = pending
+        if timeout is None:
+            timeout = fallback
+        deadline = time.monotonic() + timeout
+        if self.subscribed:
+            confirmed = _wait_for(done, deadline, cancel) and done.is_set()
+        else:
+            _wait_for(None, deadline, cancel)
+            confirmed = False
+
+        with self._lock:
+            self._pending.pop(utterance_id, None)
+        return confirmed
+
+    def _stop_clip(self):
+        if time.monotonic() < self._clip_until:
+            self.misty.stop_audio()
+            self._clip_until = 0.0
+
+    def say(self, text, pitch=None, timeout=None):
+        """speak() and wait() in one go."""
+        return self.wait(self.speak(text, pitch), timeout)
+
+    def close(self):
+        """Stop listening for TextToSpeechComplete."""
+        if self.subscribed:
+            self.subscribed = False
+            try:
+                self.misty.unregister_event(self.event_name)
+            except Exception as e:
+                print(f"Could not unregister {self.event_name}:", e)
+
+
+def _wait_for(done, deadline, cancel):
+    """
+    Wait until `done` is set or the monotonic deadline passes.
+    Returns True if it ended early (done or cancel set).
+    """
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        if cancel is not None and cancel.is_set():
+            return True
+        if done is None and cancel is None:
+            time.sleep(remaining)
+            return False
+        if done is None:
+            return cancel.wait(remaining)
+        # Two events can't be waited on at once, so poll the cancel event
+        step = remaining if cancel is None else min(remaining, CANCEL_POLL)
+        if done.wait(step):
+            return True
@@ -0,0 +1,46 @@
+"""
+Checks for the circuit breaker in resilience.call():
+
+    python -m pytest -q test_resilience.py
+"""
+import pytest
+from requests.exceptions import ConnectTimeout, ReadTimeout
+
+import resilience
+from resilience import CircuitBreaker, RobotOffline, call
+
+
+def breaker(name):
+    def probe():
+        raise ConnectionError("still down")
+
+    return CircuitBreaker(name, probe, probe_interval=60, on_change=lambda *_: None)
+
+
+def timing_out(error):
+    def send(timeout):
+        raise error("no answer")
+
+    return send
+
+
+@pytest.mark.parametrize("error", [ConnectTimeout, ReadTimeout])
+@pytest.mark.parametrize("endpoint", ["led", "images/display"])
+def test_timeouts_under_the_endpoint_deadline_trip_the_breaker(endpoint, error):
+    # Both deadlines are shorter than the transport's (2, 5) s timeout
+    robot = breaker(f"{endpoint}-{error.__name__}")
+    for _ in range(resilience.FAILURE_THRESHOLD):
+        with pytest.raises(error):
+            call(timing_out(error), "POST", endpoint, (2.0, 5.0), robot)
+    assert not robot.online
+    with pytest.raises(RobotOffline):
+        call(timing_out(error), "POST", endpoint, (2.0, 5.0), robot)
+
+
+def test_timeouts_under_the_callers_budget_do_not_count():
+    robot = breaker("budgeted")
+    for _ in range(resilience.FAILURE_THRESHOLD + 1):
+        with pytest.raises(ReadTimeout):
+            call(timing_out(ReadTimeout), "GET", "battery", (2.0, 5.0), robot, deadline=0.2)
+    assert robot.online
+    assert robot.failures == 0
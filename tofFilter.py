@@ -0,0 +1,142 @@
+from array import array
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+MODES = ("median", "ema", "reject")
+EMA_ALPHA = 0.4     # weight of each new reading in "ema" mode
+MAX_JUMP = 0.5      # m a reading may differ from the window median in "reject" mode
+MIN_HISTORY = 3     # readings needed before "reject" trusts its median
+
+
+# --------------------------------------
+# RING FILTER
+# --------------------------------------
+
+class RingFilter:
+    """
+    Smooths one stream of distance readings over the last `size` samples.
+
+    mode:
+      "median": median of the window; single spikes never get through
+      "ema":    exponential moving average (EMA_ALPHA)
+      "reject": pass readings through, but replace any that jump more
+                than MAX_JUMP away from the window median by that median
+
+    The window and its sorted copy are preallocated arrays updated in
+    place, so update() doesn't allocate anything per reading.
+    """
+
+    def __init__(self, size=5, mode="median", alpha=EMA_ALPHA, max_jump=MAX_JUMP):
+        if mode not in MODES:
+            raise ValueError(f"Unknown filter mode {mode!r}, expected one of {MODES}")
+        self.size = size
+        self.mode = mode
+        self.alpha = alpha
+        self.max_jump = max_jump
+        self.ring = array("d", [0.0] * size)
+        self.ordered = array("d", [0.0] * size)
+        self.reset()
+
+    def reset(self):
+        """Forget all readings (e.g. when the person leaves)."""
+        self.count = 0
+        self.pos = 0
+        self.value = None
+
+    # ------------- WINDOW -------------
+
+    def _push(self, x):
+        """Add x to the ring and keep `ordered` sorted by moving one slot."""
+        ordered = self.ordered
+        if self.count < self.size:
+            i = self.count
+            self.count += 1
+        else:
+            # Overwrite the slot of the reading that falls out of the window
+            old = self.ring[self.pos]
+            i = 0
+            while ordered[i] != old:
+                i += 1
+        ordered[i] = x
+        while i > 0 and ordered[i - 1] > ordered[i]:
+            ordered[i - 1], ordered[i] = ordered[i], ordered[i - 1]
+            i -= 1
+        while i + 1 < self.count and ordered[i + 1] < ordered[i]:
+            ordered[i + 1], ordered[i] = ordered[i], ordered[i + 1]
+            i += 1
+        self.ring[self.pos] = x
+        self.pos = (self.pos + 1) % self.size
+
+    def median(self):
+        n = self.count
+        if n == 0:
+            return None
+        mid = n // 2
+        if n % 2:
+            return self.ordered[mid]
+        return (self.ordered[mid - 1] + self.ordered[mid]) / 2.0
+
+    # ------------- FILTERING -------------
+
+    def update(self, x):
+        """Add one reading, return the filtered distance (None/NaN readings are skipped)."""
+        if x is None or x != x:
+            return self.value
+
+        if self.mode == "median":
+            self._push(x)
+            self.value = self.median()
+        elif self.mode == "ema":
+            self._push(x)
+            self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        else:
+            reference = self.median()
+            self._push(x)
+            if self.count > MIN_HISTORY and abs(x - reference) > self.max_jump:
+                # A real move shifts the median within a few readings
+                self.value = reference
+            else:
+                self.value = x
+        return self.value
+
+
+# --------------------------------------
+# OFFLINE TUNING
+# --------------------------------------
+
+def filter_series(values, size=5, mode="median", **options):
+    """Run a fresh filter over a whole array of readings; returns array('d')."""
+    ring = RingFilter(size, mode, **options)
+    out = array("d", bytes(8 * len(values)))
+    for i, x in enumerate(values):
+        value = ring.update(float(x))
+        out[i] = float("nan") if value is None else value
+    return out
+
+
+def zone_changes(values, classify):
+    """
+    How often classify(distance, zone) -> zone would switch zones, i.e.
+    how many behaviors the readings would trigger. NaN samples (empty
+    filter windows, dropped readings) keep the current zone.
+    """
+    zone = None
+    changes = 0
+    for x in values:
+        if x != x:
+            continue
+        new_zone = classify(x, zone)
+        if new_zone != zone:
+            changes += 1
+            zone = new_zone
+    return changes
+
+
+def compare(values, classify, sizes=(3, 5, 7), modes=MODES):
+    """Zone changes of the raw readings and of every filter setting."""
+    results = {("raw", 1): zone_changes(values, classify)}
+    for mode in modes:
+        for size in sizes:
+            results[(mode, size)] = zone_changes(filter_series(values, size, mode), classify)
+    return results
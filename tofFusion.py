@@ -0,0 +1,93 @@
+import math
+import threading
+
+from tofFilter import RingFilter
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+
+# Where each range sensor looks, in degrees (0 = straight ahead, + = left)
+SENSOR_BEARINGS = {
+    "Center": 0.0,
+    "Left": 30.0,
+    "Right": -30.0,
+    "Back": 180.0,
+}
+MAX_AGE = 1.0        # s before a sensor's last reading no longer counts
+FUSION_BAND = 0.15   # m; sensors this close to the nearest one share the bearing
+
+
+def sensor_condition(position):
+    """EventConditions that make Misty stream only this sensor's readings."""
+    return [{"Property": "SensorPosition", "Inequality": "=", "Value": position}]
+
+
+# --------------------------------------
+# FUSION
+# --------------------------------------
+
+class TofFusion:
+    """
+    Latest (filtered) reading and its time for every subscribed ToF sensor,
+    combined into one estimate of the nearest person.
+
+    nearest(now) returns (distance m, bearing degrees, sensor) or None.
+    The distance is the closest fresh reading; the bearing is the
+    1/distance-weighted direction of every sensor within FUSION_BAND of
+    it, so someone between Center and Left comes out at about +15 degrees.
+    """
+
+    def __init__(self, sensors=("Center", "Left", "Right"), window=5, mode="median",
+                 max_age=MAX_AGE):
+        unknown = [s for s in sensors if s not in SENSOR_BEARINGS]
+        if unknown:
+            raise ValueError(f"Unknown ToF sensors {unknown}, expected {list(SENSOR_BEARINGS)}")
+        self.sensors = tuple(sensors)
+        self.max_age = max_age
+        self.filters = {s: RingFilter(window, mode) for s in self.sensors}
+        self.latest = {}  # sensor -> (filtered distance m, time received)
+        self._lock = threading.Lock()
+
+    def update(self, position, distance, now):
+        """Store one reading; readings of sensors we don't fuse are ignored."""
+        ring = self.filters.get(position)
+        if ring is None:
+            return None
+        with self._lock:
+            value = ring.update(distance)
+            if value is not None:
+                self.latest[position] = (value, now)
+            return value
+
+    def reset(self):
+        with self._lock:
+            for ring in self.filters.values():
+                ring.reset()
+            self.latest.clear()
+
+    def readings(self, now):
+        """{sensor: distance} of every reading that is still fresh."""
+        with self._lock:
+            return {
+                sensor: distance
+                for sensor, (distance, seen) in self.latest.items()
+                if now - seen <= self.max_age
+            }
+
+    def nearest(self, now):
+        fresh = self.readings(now)
+        if not fresh:
+            return None
+        sensor = min(fresh, key=fresh.get)
+        distance = fresh[sensor]
+
+        x = y = 0.0
+        for name, d in fresh.items():
+            if d - distance <= FUSION_BAND:
+                angle = math.radians(SENSOR_BEARINGS[name])
+                weight = 1.0 / max(d, 0.05)
+                x += weight * math.cos(angle)
+                y += weight * math.sin(angle)
+        bearing = math.degrees(math.atan2(y, x))
+        return distance, bearing, sensor
@@ -0,0 +1,113 @@
+import threading
+import time
+import traceback
+from collections import deque
+
+# --------------------------------------
+# CONFIG
+# --------------------------------------
+
+# Commands that jump the queue and cancel whatever the robot is doing
+URGENT = {8, 99}      # didn't hear, goodbye
+# ...and of those, the ones that also drop everything still queued
+ENDS_SESSION = {99}
+
+
+# --------------------------------------
+# COMMAND QUEUE
+# --------------------------------------
+
+class CommandQueue:
+    """
+    Runs wizard commands one at a time on a background thread, so the
+    prompt never blocks on the robot.
+
+    dispatch(game, cmd, args) does the actual work (memoryGame.run_command).
+    Long commands must watch game.cancel (a threading.Event); urgent
+    commands set it to cut the running command short.
+    on_done(cmd, args, outcome, seconds) is called after every command,
+    with outcome "done", "cancelled" or "error" and the time from submit.
+    """
+
+    def __init__(self, game, dispatch, on_done=None):
+        self.game = game
+        self.dispatch = dispatch
+        self.on_done = on_done
+        self.pending = deque()  # (cmd, args, submitted) waiting to run
+        self.current = None     # (cmd, args, submitted) running right now
+        self._cond = threading.Condition()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="wizard-queue", daemon=True)
+        self._worker.start()
+
+    def submit(self, cmd, args=()):
+        """Queue a command; urgent ones preempt the running command."""
+        with self._cond:
+            if cmd in URGENT:
+                if cmd in ENDS_SESSION:
+                    self.pending.clear()
+                self.pending.appendleft((cmd, list(args), time.monotonic()))
+                if self.current is not None:
+                    self.game.cancel.set()
+            else:
+                self.pending.append((cmd, list(args), time.monotonic()))
+            self._cond.notify()
+
+    def cancel(self):
+        """Drop every queued command and stop the running one."""
+        with self._cond:
+            self.pending.clear()
+            if self.current is not None:
+                self.game.cancel.set()
+
+    def snapshot(self):
+        """(running command or None, list of queued commands), as (cmd, args)."""
+        with self._cond:
+            current = self.current[:2] if self.current else None
+            return current, [command[:2] for command in self.pending]
+
+    def close(self, timeout=None):
+        """Cancel what's left and wait for the worker to stop."""
+        with self._cond:
+            self._closed = True
+            self.pending.clear()
+            if self.current is not None:
+                self.game.cancel.set()
+            self._cond.notify()
+        self._worker.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self.pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self.current = self.pending.popleft()
+                self.game.cancel.clear()
+            cmd, args, submitted = self.current
+            outcome = "done"
+            try:
+                self.dispatch(self.game, cmd, args)
+            except ConnectionError as e:  # RobotOffline, or not connected yet
+                outcome = "offline"
+                print(f"Command {cmd} skipped: {e}")
+            except Exception:
+                outcome = "error"
+                print(f"Command {cmd} failed:")
+                traceback.print_exc()
+            finally:
+                with self._cond:
+                    self.current = None
+            if outcome == "done" and self.game.cancel.is_set():
+                outcome = "cancelled"
+            if self.on_done is not None:
+                self.on_done(cmd, args, outcome, time.monotonic() - submitted)
+
+
+def describe(command, labels):
+    """'2 3 4 (Play round)' style text for one queued command."""
+    cmd, args = command
+    text = " ".join(str(x) for x in [cmd, *args])
+    label = labels.get(cmd)
+    return f"{text} ({label})" if label else text